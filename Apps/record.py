@@ -14,43 +14,99 @@ Anforderungen: siehe ../Anforderungen/record.md
 """
 
 import argparse
+import asyncio
+import functools
+import json
 import logging
+import os
+import re
+import selectors
+import shutil
 import signal
 import subprocess
 import sys
+import threading
 import time
-from datetime import datetime
+from logging.handlers import MemoryHandler
 from pathlib import Path
 
 # Ermittle das Verzeichnis des Scripts (Repository-Root)
 SCRIPT_DIR = Path(__file__).parent.parent
 DEFAULT_OUTPUT_DIR = SCRIPT_DIR / "Recordings"
 
+
+class BatchingMemoryHandler(MemoryHandler):
+    """
+    MemoryHandler, der beim Flush alle gepufferten Zeilen mit einem einzigen
+    write() an den Ziel-Stream übergibt statt mit einem write() pro Zeile.
+    """
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.target and self.buffer:
+                # Fehler beim Schreiben (z.B. BrokenPipeError bei `record.py | head`)
+                # wie StreamHandler.emit über handleError melden statt sie an den
+                # Aufrufer von logger.info() weiterzureichen
+                try:
+                    text = "".join(self.format(record) + "\n" for record in self.buffer)
+                    with self.target.lock:
+                        self.target.stream.write(text)
+                        self.target.flush()
+                except RecursionError:
+                    raise
+                except Exception:
+                    self.target.handleError(self.buffer[-1])
+                self.buffer.clear()
+        finally:
+            self.release()
+
+
+# Log-Zeilen werden gesammelt und gebündelt ausgegeben: spätestens nach 16
+# Zeilen, bei Warnungen/Fehlern sofort und an expliziten Stellen (vor
+# Eingaben, vor dem Start der Aufnahme und nach dem Abschluss-Bericht)
+log_buffer = BatchingMemoryHandler(
+    capacity=16,
+    flushLevel=logging.WARNING,
+    target=logging.StreamHandler(sys.stdout),
+)
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[logging.StreamHandler(sys.stdout)],
+    handlers=[log_buffer],
 )
 logger = logging.getLogger(__name__)
 
-# Globale Variablen für Prozesse
-recording_process = None
-start_time = None
+# Intervall in Sekunden, in dem der Page-Cache der Aufnahme-Datei freigegeben wird
+PAGE_CACHE_DROP_INTERVAL = 30
+
+# media.class aus pw-cli -> (Präfix des ALSA-Namens, Beschriftung, is_monitor)
+PW_CLI_NODE_KINDS = {
+    b"Audio/Sink": (b"alsa_output", "System-Audio", True),
+    b"Audio/Source": (b"alsa_input", "Mikrofon", False),
+}
 
+# Cache für erkannte Audio-Quellen und dessen Gültigkeit in Sekunden
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "transcribeaudio"
+SOURCES_CACHE_PATH = CACHE_DIR / "sources.json"
+SOURCES_CACHE_TTL = 30
 
-def signal_handler(signum, frame):
-    """Handler für SIGINT (Ctrl+C)."""
-    global recording_process
-    logger.info("Beende Aufnahme...")
-    if recording_process:
-        recording_process.terminate()
+# Nice-Wert und Anzahl CPU-Kerne für den Recorder-Prozess (siehe prioritize_recorder)
+RECORDER_NICE = -5
+RECORDER_CPU_COUNT = 2
+
+# Einheiten für format_size (1024er-Schritte)
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+# Eigenschaften aus pw-cli list-objects (als bytes), z.B.: node.name = "alsa_output.pci..."
+PW_CLI_PROPERTY = re.compile(rb'(node\.name|node\.description|media\.class)\s*=\s*"?([^"\n]*)"?')
 
 
 def format_duration(seconds: float) -> str:
     """Formatiert Sekunden als lesbare Dauer."""
-    minutes = int(seconds // 60)
-    secs = int(seconds % 60)
+    minutes, secs = divmod(int(seconds), 60)
     if minutes > 0:
         return f"{minutes} Minute{'n' if minutes != 1 else ''} {secs} Sekunde{'n' if secs != 1 else ''}"
     return f"{secs} Sekunde{'n' if secs != 1 else ''}"
@@ -58,112 +114,248 @@ def format_duration(seconds: float) -> str:
 
 def format_size(bytes_size: int) -> str:
     """Formatiert Bytes als lesbare Größe."""
-    for unit in ["B", "KB", "MB", "GB"]:
-        if bytes_size < 1024:
-            return f"{bytes_size:.1f} {unit}"
-        bytes_size /= 1024
-    return f"{bytes_size:.1f} TB"
+    if bytes_size <= 0:
+        return "0.0 B"
+    # Einheit direkt aus der Bitlänge: je 10 Bit eine Einheit weiter (1024er-Schritte)
+    idx = min((bytes_size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{bytes_size / (1 << (idx * 10)):.1f} {SIZE_UNITS[idx]}"
+
+
+@functools.lru_cache(maxsize=None)
+def find_tool(name: str) -> str | None:
+    """Sucht ein Programm im PATH (ohne Subprozess, Ergebnis wird gecacht)."""
+    return shutil.which(name)
 
 
-def get_audio_sources() -> list[tuple[str, str, bool]]:
+def run_command(cmd: list[str], timeout: float = 5) -> bytes | None:
+    """
+    Führt ein Kommando aus und gibt dessen stdout (undekodiert) zurück.
+
+    Gibt None zurück, wenn das Kommando fehlt, fehlschlägt oder in den
+    Timeout läuft.
+    """
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=timeout,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def parse_pactl_defaults(output: bytes) -> tuple[str | None, str | None]:
+    """Liest Default Sink und Default Source aus der Ausgabe von pactl info."""
+    default_sink = None
+    default_source = None
+    for line in output.split(b"\n"):
+        if line.startswith(b"Default Sink:"):
+            default_sink = line.split(b":", 1)[1].strip().decode("utf-8", "replace")
+        elif line.startswith(b"Default Source:"):
+            default_source = line.split(b":", 1)[1].strip().decode("utf-8", "replace")
+    return default_sink, default_source
+
+
+def parse_pw_cli_objects(
+    lines,
+    default_sink_alsa: str | None,
+    default_source_alsa: str | None,
+) -> list[tuple[str, str, bool]]:
     """
-    Listet verfügbare Audio-Quellen über wpctl auf.
+    Wertet die Ausgabe von pw-cli list-objects zeilenweise aus.
     Gibt Liste von (target_name, beschreibung, is_monitor) zurück.
 
-    Für System-Audio (Sinks) wird der ALSA-Name mit .monitor verwendet,
-    für Mikrofone (Sources) der direkte ALSA-Name.
+    Die Zeilen werden als bytes verarbeitet; dekodiert werden nur Name und
+    Beschreibung der Knoten, die tatsächlich in die Liste aufgenommen werden.
     """
     sources = []
-    default_sink_alsa = None
-    default_source_alsa = None
+    current_node_name = None
+    current_media_class = None
+    current_description = None
+
+    for line in lines:
+        match = PW_CLI_PROPERTY.search(line)
+        if not match:
+            continue
+        key, value = match.group(1), match.group(2).strip()
+
+        if key == b"node.name":
+            current_node_name = value
+            continue
+        if key == b"node.description":
+            current_description = value
+            continue
+        current_media_class = value
+
+        # Wenn wir node.name und media.class haben, verarbeiten.
+        # Ein Dict-Lookup ersetzt die Vergleiche mit jeder media.class einzeln.
+        kind = PW_CLI_NODE_KINDS.get(current_media_class)
+        if current_node_name and kind and current_node_name.startswith(kind[0]):
+            _, label, is_monitor = kind
+            node_name = current_node_name.decode("utf-8", "replace")
+            # System-Audio: Monitor des Sinks, Mikrofon: direkte Quelle
+            target_name = f"{node_name}.monitor" if is_monitor else node_name
+            display_name = current_description.decode("utf-8", "replace") if current_description else node_name
+            default_name = default_sink_alsa if is_monitor else default_source_alsa
+            is_default = (node_name == default_name)
+
+            desc = f"{label}: {display_name}"
+            if is_default:
+                desc += " (Standard)"
+            # Der Standard-Sink steht immer ganz vorne (Enter-Auswahl)
+            if is_default and is_monitor:
+                sources.insert(0, (target_name, desc, is_monitor))
+            else:
+                sources.append((target_name, desc, is_monitor))
+
+        # Reset nach Verarbeitung
+        current_node_name = None
+        current_media_class = None
+        current_description = None
 
-    # Default-Geräte über pactl info ermitteln.
-    # Wichtig: wpctl status liefert bei Bluetooth-Geräten den bluez_-Protokollnamen,
-    # aber pw-cli und parecord verwenden den alsa_output/alsa_input-Namen.
-    # pactl info liefert immer den korrekten PulseAudio-kompatiblen Namen.
+    return sources
+
+
+def load_cached_sources(
+    cache_path: Path,
+    ttl: float = SOURCES_CACHE_TTL,
+) -> list[tuple[str, str, bool]] | None:
+    """
+    Lädt zwischengespeicherte Audio-Quellen.
+
+    Gibt None zurück, wenn kein Cache existiert, er älter als ttl Sekunden
+    oder nicht lesbar ist.
+    """
     try:
-        result = subprocess.run(
-            ["pactl", "info"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            for line in result.stdout.split("\n"):
-                if line.startswith("Default Sink:"):
-                    default_sink_alsa = line.split(":", 1)[1].strip()
-                elif line.startswith("Default Source:"):
-                    default_source_alsa = line.split(":", 1)[1].strip()
+        if time.time() - cache_path.stat().st_mtime >= ttl:
+            return None
+        entries = json.loads(cache_path.read_text(encoding="utf-8"))
+        return [(name, desc, bool(is_monitor)) for name, desc, is_monitor in entries]
+    except (OSError, ValueError, TypeError):
+        return None
 
-    except (subprocess.TimeoutExpired, FileNotFoundError):
+
+def save_cached_sources(cache_path: Path, sources: list[tuple[str, str, bool]]) -> None:
+    """Speichert Audio-Quellen im Cache (Fehler werden ignoriert)."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(sources), encoding="utf-8")
+    except OSError:
         pass
 
-    # ALSA-Namen und Beschreibungen aus pw-cli holen
+
+@functools.lru_cache(maxsize=1)
+def get_audio_sources(use_cache: bool = True) -> list[tuple[str, str, bool]]:
+    """
+    Liefert die verfügbaren Audio-Quellen.
+
+    Das Ergebnis von probe_audio_sources() wird SOURCES_CACHE_TTL Sekunden
+    lang in SOURCES_CACHE_PATH zwischengespeichert, damit schnell
+    wiederholte Starts nicht erneut pactl und pw-cli aufrufen müssen.
+    Mit use_cache=False wird immer neu erkannt.
+    """
+    if use_cache:
+        cached = load_cached_sources(SOURCES_CACHE_PATH)
+        if cached is not None:
+            return cached
+
+    sources = probe_audio_sources()
+    # Leere Ergebnisse nicht cachen, damit ein neu angeschlossenes Gerät sofort erkannt wird
+    if sources:
+        save_cached_sources(SOURCES_CACHE_PATH, sources)
+    return sources
+
+
+def probe_audio_sources() -> list[tuple[str, str, bool]]:
+    """
+    Listet verfügbare Audio-Quellen über pw-cli auf.
+    Gibt Liste von (target_name, beschreibung, is_monitor) zurück.
+
+    Für System-Audio (Sinks) wird der ALSA-Name mit .monitor verwendet,
+    für Mikrofone (Sources) der direkte ALSA-Name.
+
+    pw-cli läuft parallel zu pactl, seine Ausgabe wird zeilenweise gelesen
+    und direkt ausgewertet, statt sie erst komplett zu puffern.
+    """
+    # pw-cli zuerst starten, damit es arbeitet, während pactl läuft
     try:
-        result = subprocess.run(
+        pw_cli = subprocess.Popen(
             ["pw-cli", "list-objects"],
-            capture_output=True,
-            text=True,
-            timeout=5,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
         )
-        if result.returncode == 0:
-            current_node_name = None
-            current_media_class = None
-            current_description = None
-
-            for line in result.stdout.split("\n"):
-                line = line.strip()
-                if "node.name" in line and "=" in line:
-                    parts = line.split("=", 1)
-                    if len(parts) >= 2:
-                        current_node_name = parts[1].strip().strip('"')
-                elif "node.description" in line and "=" in line:
-                    parts = line.split("=", 1)
-                    if len(parts) >= 2:
-                        current_description = parts[1].strip().strip('"')
-                elif "media.class" in line and "=" in line:
-                    parts = line.split("=", 1)
-                    if len(parts) >= 2:
-                        current_media_class = parts[1].strip().strip('"')
-
-                        # Wenn wir node.name und media.class haben, verarbeiten
-                        if current_node_name and current_media_class:
-                            if current_media_class == "Audio/Sink" and current_node_name.startswith("alsa_output"):
-                                # System-Audio: Monitor des Sinks
-                                monitor_name = f"{current_node_name}.monitor"
-                                display_name = current_description or current_node_name
-                                is_default = (current_node_name == default_sink_alsa)
-
-                                desc = f"System-Audio: {display_name}"
-                                if is_default:
-                                    desc += " (Standard)"
-                                    sources.insert(0, (monitor_name, desc, True))
-                                else:
-                                    sources.append((monitor_name, desc, True))
-
-                            elif current_media_class == "Audio/Source" and current_node_name.startswith("alsa_input"):
-                                # Mikrofon: Direkte Quelle
-                                display_name = current_description or current_node_name
-                                is_default = (current_node_name == default_source_alsa)
-
-                                desc = f"Mikrofon: {display_name}"
-                                if is_default:
-                                    desc += " (Standard)"
-                                sources.append((current_node_name, desc, False))
-
-                        # Reset nach Verarbeitung
-                        current_node_name = None
-                        current_media_class = None
-                        current_description = None
+    except FileNotFoundError:
+        pw_cli = None
 
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
+    # Default-Geräte über pactl info ermitteln.
+    # Wichtig: wpctl status liefert bei Bluetooth-Geräten den bluez_-Protokollnamen,
+    # aber pw-cli und parecord verwenden den alsa_output/alsa_input-Namen.
+    # pactl info liefert immer den korrekten PulseAudio-kompatiblen Namen.
+    default_sink_alsa = None
+    default_source_alsa = None
+    pactl_output = run_command(["pactl", "info"])
+    if pactl_output is not None:
+        default_sink_alsa, default_source_alsa = parse_pactl_defaults(pactl_output)
+
+    if pw_cli is None:
+        return []
 
+    # ALSA-Namen und Beschreibungen aus pw-cli holen.
+    # Der Timer beendet pw-cli, falls es hängt, damit das Lesen nicht blockiert.
+    watchdog = threading.Timer(5, pw_cli.kill)
+    watchdog.start()
+    try:
+        sources = parse_pw_cli_objects(pw_cli.stdout, default_sink_alsa, default_source_alsa)
+        returncode = pw_cli.wait()
+    finally:
+        watchdog.cancel()
+        pw_cli.stdout.close()
+
+    if returncode != 0:
+        return []
     return sources
 
 
+# Bereits von stdin gelesene, aber noch nicht zurückgegebene Bytes (read_line)
+_stdin_pending = bytearray()
+
+
+def read_line(prompt: str) -> str:
+    """
+    Liest eine Zeile von stdin, wie input(), aber per select auf dem FD.
+
+    Gelesen wird ungepuffert mit os.read; Bytes nach dem Zeilenende bleiben
+    in einem eigenen Puffer für den nächsten Aufruf. So sieht select nie
+    einen schon leeren FD, während Python-Puffer noch Zeilen enthalten.
+    Ein Ctrl+C bricht das Warten in select sofort mit KeyboardInterrupt ab.
+    Bei EOF wird wie bei input() EOFError ausgelöst.
+    """
+    print(prompt, end="", flush=True)
+
+    fd = sys.stdin.fileno()
+    # SelectSelector statt DefaultSelector: epoll lehnt umgeleitete
+    # reguläre Dateien als stdin ab, select meldet sie einfach als lesbar
+    with selectors.SelectSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while b"\n" not in _stdin_pending:
+            selector.select()
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                if not _stdin_pending:
+                    raise EOFError
+                break
+            _stdin_pending.extend(chunk)
+
+    line, _, rest = bytes(_stdin_pending).partition(b"\n")
+    _stdin_pending[:] = rest
+    return line.decode(errors="replace").rstrip("\r")
+
+
 def ask_audio_source(sources: list[tuple[str, str, bool]]) -> str | None:
     """Fragt den Benutzer nach der Audio-Quelle."""
+    log_buffer.flush()
     print()
     print("Audio-Quelle auswählen:")
     for i, (_, desc, _) in enumerate(sources):
@@ -172,7 +364,7 @@ def ask_audio_source(sources: list[tuple[str, str, bool]]) -> str | None:
 
     while True:
         try:
-            choice = input(f"Auswahl (0-{len(sources)-1}, Enter für Standard): ").strip()
+            choice = read_line(f"Auswahl (0-{len(sources)-1}, Enter für Standard): ").strip()
             if choice == "":
                 return sources[0][0] if sources else None
             idx = int(choice)
@@ -191,6 +383,7 @@ def ask_recording_mode() -> int | None:
     Fragt den Benutzer nach dem Aufnahme-Modus.
     Gibt None zurück für unbegrenzte Aufnahme, oder Anzahl Minuten für zeitlimitiert.
     """
+    log_buffer.flush()
     print()
     print("Aufnahme-Modus:")
     print("  [0] Unbegrenzt (Ctrl+C zum Stoppen)")
@@ -199,7 +392,7 @@ def ask_recording_mode() -> int | None:
 
     while True:
         try:
-            choice = input("Auswahl (0-1, Enter für unbegrenzt): ").strip()
+            choice = read_line("Auswahl (0-1, Enter für unbegrenzt): ").strip()
             if choice == "" or choice == "0":
                 return None
             if choice == "1":
@@ -214,7 +407,7 @@ def ask_duration_minutes() -> int:
     """Fragt den Benutzer nach der Aufnahme-Dauer in Minuten."""
     while True:
         try:
-            minutes_str = input("Aufnahme-Dauer in Minuten: ").strip()
+            minutes_str = read_line("Aufnahme-Dauer in Minuten: ").strip()
             minutes = int(minutes_str)
             if minutes > 0:
                 return minutes
@@ -226,9 +419,174 @@ def ask_duration_minutes() -> int:
             sys.exit(0)
 
 
-def main():
-    global recording_process, start_time
+def drop_page_cache(fd: int) -> None:
+    """Gibt bereits geschriebene Seiten der Datei im Page-Cache frei."""
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+
+
+async def drop_page_cache_periodically(fd: int) -> None:
+    """Ruft drop_page_cache() alle PAGE_CACHE_DROP_INTERVAL Sekunden auf."""
+    while True:
+        await asyncio.sleep(PAGE_CACHE_DROP_INTERVAL)
+        drop_page_cache(fd)
+
+
+def prioritize_recorder() -> None:
+    """
+    Läuft im Recorder-Prozess direkt vor dem exec (preexec_fn).
+
+    Erhöht die Priorität von parecord und bindet es an feste CPU-Kerne,
+    damit es auf ausgelasteten Systemen seltener verdrängt wird (weniger
+    Aussetzer/Knackser). Eine höhere Priorität benötigt CAP_SYS_NICE
+    (bzw. root); ohne diese Berechtigung bleibt parecord bei normaler
+    Priorität und ohne feste Kerne - die Bindung allein würde nur die
+    Freiheit des Schedulers einschränken.
+    """
+    try:
+        os.nice(RECORDER_NICE)
+    except OSError:
+        return
+    try:
+        # Die letzten Kerne: CPU 0/1 bedienen meist die meisten Interrupts
+        os.sched_setaffinity(0, sorted(os.sched_getaffinity(0))[-RECORDER_CPU_COUNT:])
+    except OSError:
+        pass
+
+
+async def supervise_recording(
+    record_cmd: list[str],
+    output_fd: int,
+    duration_minutes: int | None,
+) -> None:
+    """
+    Startet den Recorder und wartet auf dessen Ende.
 
+    Der Recorder schreibt nach stdout, das auf output_fd zeigt. Während der
+    Aufnahme wird der Page-Cache dieser Datei regelmäßig freigegeben, damit
+    lange Aufnahmen nicht Gigabytes an nie wieder gelesenen Daten im
+    Speicher halten.
+
+    SIGINT (Ctrl+C) und SIGTERM werden über die Event-Loop behandelt und
+    beenden den Recorder. Bei zeitlimitierter Aufnahme wird der Recorder
+    nach Ablauf der Zeit beendet.
+    """
+    # Signale zuerst registrieren, damit auch ein Ctrl+C während des Starts
+    # ankommt. Die Event-Loop empfängt das Signal über ihr Wakeup-FD
+    # (signal.set_wakeup_fd) im Selector; der Callback setzt nur ein Event.
+    loop = asyncio.get_running_loop()
+    stop_requested = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop_requested.set)
+
+    cache_task = None
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *record_cmd,
+            stdout=output_fd,
+            # stderr wird nie gelesen: DEVNULL statt PIPE, damit parecord bei
+            # langen Aufnahmen nie an einem vollen Pipe-Puffer hängen bleibt
+            stderr=asyncio.subprocess.DEVNULL,
+            preexec_fn=prioritize_recorder,
+        )
+        cache_task = asyncio.create_task(drop_page_cache_periodically(output_fd))
+
+        # Warte auf Prozessende, Signal oder Zeitlimit - je nachdem, was zuerst eintritt
+        exit_task = asyncio.create_task(process.wait())
+        stop_task = asyncio.create_task(stop_requested.wait())
+        timeout_seconds = duration_minutes * 60 if duration_minutes else None
+        done, _ = await asyncio.wait(
+            {exit_task, stop_task},
+            timeout=timeout_seconds,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        stop_task.cancel()
+
+        if exit_task not in done:
+            if stop_task in done:
+                logger.info("Beende Aufnahme...")
+            else:
+                logger.info("Zeitlimit von %d Minute%s erreicht", duration_minutes, "n" if duration_minutes != 1 else "")
+            process.terminate()
+            await exit_task
+    finally:
+        if cache_task:
+            cache_task.cancel()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(signum)
+
+
+def build_record_cmd(source: str) -> list[str]:
+    """
+    Baut das parecord-Kommando für die angegebene Audio-Quelle.
+
+    Ohne Dateiname schreibt parecord nach stdout, das beim Start auf die
+    Aufnahme-Datei gesetzt wird.
+    """
+    # Nutze parecord (PulseAudio/PipeWire-Pulse Recorder)
+    # Dies ist der zuverlässigste Weg für Monitor-Aufnahmen
+    return [
+        "parecord",
+        "-d", source,               # Audio-Quelle (inkl. .monitor für System-Audio)
+        "--file-format=wav",        # WAV-Format, ohne Dateiname nach stdout
+    ]
+
+
+def run_recording(source: str, filepath: Path, duration_minutes: int | None) -> tuple[float, int]:
+    """
+    Nimmt von der Audio-Quelle in die Datei auf, bis Ctrl+C gedrückt wird
+    oder das Zeitlimit erreicht ist.
+
+    Returns:
+        Dauer der Aufnahme in Sekunden und Dateigröße in Bytes
+    """
+    start_time = time.time()
+
+    record_cmd = build_record_cmd(source)
+    logger.debug("Starte Aufnahme: %s > %s", " ".join(record_cmd), filepath)
+
+    # Die Datei selbst öffnen, damit ihr Page-Cache freigegeben werden kann
+    output_fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    log_buffer.flush()
+    try:
+        asyncio.run(supervise_recording(record_cmd, output_fd, duration_minutes))
+        drop_page_cache(output_fd)
+        # Größe über das offene FD statt über einen erneuten Pfad-Lookup
+        size = os.fstat(output_fd).st_size
+    except BaseException:
+        # Recorder nicht gestartet (z.B. parecord fehlt): keine leere Datei
+        # zurücklassen, transcribe.py würde sie sonst bei jedem Lauf melden
+        if os.fstat(output_fd).st_size == 0:
+            filepath.unlink(missing_ok=True)
+        raise
+    finally:
+        os.close(output_fd)
+
+    return time.time() - start_time, size
+
+
+def report_recording(filepath: Path, duration: float, size: int) -> None:
+    """Gibt den Abschluss-Bericht einer Aufnahme aus."""
+    logger.info("")
+    logger.info("=" * 50)
+    logger.info("Aufnahme beendet")
+    logger.info("Dauer: %s", format_duration(duration))
+
+    # Dateigröße anzeigen
+    # (die Datei existiert immer, da sie vorab geöffnet wird - leer heißt: nichts aufgenommen)
+    if size > 0:
+        logger.info("Gespeichert: %s", filepath)
+        logger.info("Dateigröße: %s", format_size(size))
+    else:
+        filepath.unlink(missing_ok=True)
+        logger.warning("Datei wurde nicht erstellt")
+
+    logger.info("=" * 50)
+
+
+def main():
     parser = argparse.ArgumentParser(
         description="Nimmt System-Audio auf und speichert als WAV-Datei"
     )
@@ -242,23 +600,23 @@ def main():
         "-s",
         help="Audio-Quelle (ohne Angabe: interaktive Auswahl, Standard ist System-Output)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Audio-Quellen neu erkennen statt den Cache zu verwenden ({SOURCES_CACHE_PATH})",
+    )
 
     args = parser.parse_args()
 
-    # Signal-Handler registrieren
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-
     logger.info("App gestartet")
 
     # Ausgabe-Verzeichnis erstellen
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
-    logger.info(f"Ausgabe-Verzeichnis: {output_dir}")
+    logger.info("Ausgabe-Verzeichnis: %s", output_dir)
 
     # Prüfe ob parecord verfügbar ist
-    result = subprocess.run(["which", "parecord"], capture_output=True)
-    if result.returncode != 0:
+    if find_tool("parecord") is None:
         logger.error("parecord nicht gefunden!")
         logger.error("Bitte installieren: sudo apt install pulseaudio-utils")
         sys.exit(1)
@@ -266,90 +624,46 @@ def main():
     # Audio-Quelle bestimmen
     source = args.source
     if source is None:
-        sources = get_audio_sources()
+        sources = get_audio_sources(use_cache=not args.no_cache)
         if not sources:
             logger.error("Keine Audio-Quellen gefunden!")
             sys.exit(1)
         source = ask_audio_source(sources)
 
-    logger.info(f"Audio-Quelle: {source}")
+    logger.info("Audio-Quelle: %s", source)
 
     # Aufnahme-Modus bestimmen
     duration_minutes = ask_recording_mode()
     if duration_minutes:
-        logger.info(f"Zeitlimitierte Aufnahme: {duration_minutes} Minute{'n' if duration_minutes != 1 else ''}")
+        logger.info("Zeitlimitierte Aufnahme: %d Minute%s", duration_minutes, "n" if duration_minutes != 1 else "")
     else:
         logger.info("Unbegrenzte Aufnahme (Ctrl+C zum Stoppen)")
 
     # Dateiname mit Zeitstempel
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     filename = f"recording_{timestamp}.wav"
     filepath = output_dir / filename
 
-    logger.info(f"Starte Aufnahme: {filename}")
+    logger.info("Starte Aufnahme: %s", filename)
     if duration_minutes:
-        logger.info(f"Aufnahme stoppt automatisch nach {duration_minutes} Minute{'n' if duration_minutes != 1 else ''}...")
+        logger.info("Aufnahme stoppt automatisch nach %d Minute%s...", duration_minutes, "n" if duration_minutes != 1 else "")
     else:
         logger.info("Drücke Ctrl+C zum Beenden der Aufnahme...")
     logger.info("")
 
     try:
-        start_time = time.time()
-
-        # Nutze parecord (PulseAudio/PipeWire-Pulse Recorder)
-        # Dies ist der zuverlässigste Weg für Monitor-Aufnahmen
-        record_cmd = [
-            "parecord",
-            "-d", source,               # Audio-Quelle (inkl. .monitor für System-Audio)
-            "--file-format=wav",        # WAV-Format
-            str(filepath),
-        ]
-        logger.debug(f"Starte Aufnahme: {' '.join(record_cmd)}")
-        recording_process = subprocess.Popen(
-            record_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-
-        # Warte auf Prozessende (durch Signal-Handler oder Timeout)
-        if duration_minutes:
-            timeout_seconds = duration_minutes * 60
-            try:
-                recording_process.wait(timeout=timeout_seconds)
-            except subprocess.TimeoutExpired:
-                logger.info(f"Zeitlimit von {duration_minutes} Minute{'n' if duration_minutes != 1 else ''} erreicht")
-                recording_process.terminate()
-                recording_process.wait()
-        else:
-            recording_process.wait()
-
-        end_time = time.time()
-        duration = end_time - start_time
-
-        logger.info("")
-        logger.info("=" * 50)
-        logger.info("Aufnahme beendet")
-        logger.info(f"Dauer: {format_duration(duration)}")
-
-        # Dateigröße anzeigen
-        if filepath.exists():
-            size = filepath.stat().st_size
-            logger.info(f"Gespeichert: {filepath}")
-            logger.info(f"Dateigröße: {format_size(size)}")
-        else:
-            logger.warning("Datei wurde nicht erstellt")
-
-        logger.info("=" * 50)
-
+        duration, size = run_recording(source, filepath, duration_minutes)
+        report_recording(filepath, duration, size)
     except FileNotFoundError:
         logger.error("parecord nicht gefunden!")
         logger.error("Bitte installieren: sudo apt install pulseaudio-utils")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"Fehler bei Aufnahme: {e}")
+        logger.error("Fehler bei Aufnahme: %s", e)
         sys.exit(1)
 
     logger.info("App beendet")
+    log_buffer.flush()
 
 
 if __name__ == "__main__":
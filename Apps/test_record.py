@@ -0,0 +1,191 @@
+"""Tests für Hilfsfunktionen und Quellen-Erkennung aus record.py."""
+
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# record.py liegt im selben Verzeichnis
+sys.path.insert(0, str(Path(__file__).parent))
+
+import record
+from record import (
+    BatchingMemoryHandler,
+    format_duration,
+    format_size,
+    load_cached_sources,
+    parse_pactl_defaults,
+    parse_pw_cli_objects,
+    prioritize_recorder,
+    read_line,
+    run_recording,
+    save_cached_sources,
+)
+
+PW_CLI_AUSGABE = """\
+	id 50, type PipeWire:Interface:Node/3
+ 		object.serial = "50"
+ 		node.description = "Eingebautes Audio Analog Stereo"
+ 		node.name = "alsa_output.pci-0000_00_1f.3.analog-stereo"
+ 		media.class = "Audio/Sink"
+	id 51, type PipeWire:Interface:Node/3
+ 		node.description = "USB Mikrofon"
+ 		node.name = "alsa_input.usb-mic.mono-fallback"
+ 		media.class = "Audio/Source"
+	id 52, type PipeWire:Interface:Node/3
+ 		node.description = "HDMI Ausgang"
+ 		node.name = "alsa_output.pci-0000_01_00.1.hdmi-stereo"
+ 		media.class = "Audio/Sink"
+	id 53, type PipeWire:Interface:Node/3
+ 		node.description = "Kopfhörer"
+ 		node.name = "alsa_output.usb-headset.analog-stereo"
+ 		media.class = "Audio/Sink"
+	id 60, type PipeWire:Interface:Node/3
+ 		node.name = "bluez_output.00_11_22"
+ 		media.class = "Audio/Sink"
+"""
+
+
+def test_pactl_defaults():
+    ausgabe = b"Server Name: PulseAudio\nDefault Sink: sink_a\nDefault Source: source_b\n"
+    assert parse_pactl_defaults(ausgabe) == ("sink_a", "source_b")
+
+
+def test_pactl_ohne_defaults():
+    assert parse_pactl_defaults(b"") == (None, None)
+
+
+def test_pw_cli_sinks_als_monitor_und_mikrofone():
+    sources = parse_pw_cli_objects(PW_CLI_AUSGABE.encode().splitlines(keepends=True), None, None)
+    assert sources == [
+        ("alsa_output.pci-0000_00_1f.3.analog-stereo.monitor",
+         "System-Audio: Eingebautes Audio Analog Stereo", True),
+        ("alsa_input.usb-mic.mono-fallback", "Mikrofon: USB Mikrofon", False),
+        ("alsa_output.pci-0000_01_00.1.hdmi-stereo.monitor",
+         "System-Audio: HDMI Ausgang", True),
+        ("alsa_output.usb-headset.analog-stereo.monitor",
+         "System-Audio: Kopfhörer", True),
+    ]
+
+
+def test_pw_cli_standard_sink_steht_vorne():
+    sources = parse_pw_cli_objects(
+        PW_CLI_AUSGABE.encode().splitlines(keepends=True),
+        "alsa_output.pci-0000_01_00.1.hdmi-stereo",
+        "alsa_input.usb-mic.mono-fallback",
+    )
+    assert sources[0] == (
+        "alsa_output.pci-0000_01_00.1.hdmi-stereo.monitor",
+        "System-Audio: HDMI Ausgang (Standard)",
+        True,
+    )
+    assert ("alsa_input.usb-mic.mono-fallback", "Mikrofon: USB Mikrofon (Standard)", False) in sources
+
+
+def test_format_size_einheiten():
+    assert format_size(0) == "0.0 B"
+    assert format_size(1023) == "1023.0 B"
+    assert format_size(1024) == "1.0 KB"
+    assert format_size(1536) == "1.5 KB"
+    assert format_size(25 * 1024 * 1024) == "25.0 MB"
+    assert format_size(3 * 1024**3) == "3.0 GB"
+    assert format_size(2 * 1024**4) == "2.0 TB"
+    assert format_size(2048 * 1024**4) == "2048.0 TB"
+
+
+def test_format_duration():
+    assert format_duration(0) == "0 Sekunden"
+    assert format_duration(1.9) == "1 Sekunde"
+    assert format_duration(59.99) == "59 Sekunden"
+    assert format_duration(60) == "1 Minute 0 Sekunden"
+    assert format_duration(121.5) == "2 Minuten 1 Sekunde"
+
+
+def test_quellen_cache_speichern_und_laden(tmp_path):
+    cache = tmp_path / "cache" / "sources.json"
+    sources = [("sink.monitor", "System-Audio: Kopfhörer (Standard)", True), ("mic", "Mikrofon: USB", False)]
+    save_cached_sources(cache, sources)
+    assert load_cached_sources(cache) == sources
+
+
+def test_quellen_cache_abgelaufen(tmp_path):
+    cache = tmp_path / "sources.json"
+    save_cached_sources(cache, [("mic", "Mikrofon: USB", False)])
+    alt = time.time() - 60
+    os.utime(cache, (alt, alt))
+    assert load_cached_sources(cache, ttl=30) is None
+
+
+def test_quellen_cache_fehlt_oder_defekt(tmp_path):
+    cache = tmp_path / "sources.json"
+    assert load_cached_sources(cache) is None
+    cache.write_text("kein json")
+    assert load_cached_sources(cache) is None
+
+
+def test_fehlgeschlagener_start_hinterlaesst_keine_datei(tmp_path, monkeypatch):
+    async def start_fehlgeschlagen(*args, **kwargs):
+        raise FileNotFoundError("parecord")
+
+    monkeypatch.setattr(record.asyncio, "create_subprocess_exec", start_fehlgeschlagen)
+    ziel = tmp_path / "recording_20240111_143052.wav"
+    with pytest.raises(FileNotFoundError):
+        run_recording("alsa_input.test", ziel, None)
+    assert not ziel.exists()
+
+
+def test_read_line_liest_gepufferte_zeilen_nacheinander(monkeypatch, capsys):
+    lesen, schreiben = os.pipe()
+    os.write(schreiben, "0\n1\nKopfhörer".encode())
+    os.close(schreiben)
+    with open(lesen, "rb") as stdin:
+        monkeypatch.setattr(sys, "stdin", stdin)
+        assert read_line("a? ") == "0"
+        assert read_line("b? ") == "1"
+        assert read_line("c? ") == "Kopfhörer"
+        with pytest.raises(EOFError):
+            read_line("d? ")
+    assert capsys.readouterr().out == "a? b? c? d? "
+
+
+class KaputterStream:
+    def write(self, text):
+        raise BrokenPipeError(32, "Broken pipe")
+
+    def flush(self):
+        pass
+
+
+def test_log_puffer_schreibfehler_erreicht_aufrufer_nicht(monkeypatch):
+    monkeypatch.setattr(logging, "raiseExceptions", False)
+    handler = BatchingMemoryHandler(
+        capacity=16, flushLevel=logging.WARNING, target=logging.StreamHandler(KaputterStream())
+    )
+    logger = logging.getLogger("test_record.log_puffer")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        logger.warning("Aufnahme läuft weiter")
+    finally:
+        logger.removeHandler(handler)
+    assert handler.buffer == []
+
+
+def test_cpu_bindung_nur_mit_hoeherer_prioritaet(monkeypatch):
+    bindungen = []
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1, 2, 3})
+    monkeypatch.setattr(os, "sched_setaffinity", lambda pid, cpus: bindungen.append(cpus))
+
+    def keine_berechtigung(increment):
+        raise PermissionError("CAP_SYS_NICE fehlt")
+
+    monkeypatch.setattr(os, "nice", keine_berechtigung)
+    prioritize_recorder()
+    assert bindungen == []
+
+    monkeypatch.setattr(os, "nice", lambda increment: increment)
+    prioritize_recorder()
+    assert bindungen == [[2, 3]]
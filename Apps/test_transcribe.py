@@ -1,12 +1,40 @@
-"""Tests für find_untranscribed_recordings() aus transcribe.py."""
+"""Tests für Hilfsfunktionen aus transcribe.py."""
 
+import asyncio
+import os
 import sys
+import time
 from pathlib import Path
+from types import SimpleNamespace
 
 # transcribe.py liegt im selben Verzeichnis
 sys.path.insert(0, str(Path(__file__).parent))
 
-from transcribe import SUPPORTED_FORMATS, find_untranscribed_recordings
+import pytest
+from openai import APIConnectionError, APIStatusError
+
+import transcribe
+from transcribe import (
+    MAX_FILE_SIZE,
+    RecordingWatcher,
+    RETRY_MAX_DELAY,
+    SUPPORTED_FORMATS,
+    audio_digest,
+    build_mp3_cmd,
+    find_untranscribed_recordings,
+    format_size,
+    is_effectively_silent,
+    is_retryable,
+    load_cached_transcript,
+    parse_silence_duration,
+    process_file,
+    pick_mp3_bitrate,
+    retry_delay,
+    save_cached_transcript,
+    scan_untranscribed_recordings,
+    transcribe_file,
+    write_text_atomic,
+)
 
 
 def test_findet_wav_dateien(tmp_path):
@@ -48,6 +76,19 @@ def test_ignoriert_nicht_unterstuetzte_formate(tmp_path):
     assert result == []
 
 
+def test_endungen_ohne_beachtung_der_grossschreibung(tmp_path):
+    (tmp_path / "AUFNAHME.WAV").touch()
+    (tmp_path / "Podcast.Mp3").touch()
+    (tmp_path / "Podcast.txt").write_text("transkribiert")
+    result = find_untranscribed_recordings(tmp_path)
+    assert [f.name for f in result] == ["AUFNAHME.WAV"]
+
+
+def test_ignoriert_verzeichnisse(tmp_path):
+    (tmp_path / "ordner.wav").mkdir()
+    assert find_untranscribed_recordings(tmp_path) == []
+
+
 def test_leeres_verzeichnis(tmp_path):
     result = find_untranscribed_recordings(tmp_path)
     assert result == []
@@ -65,3 +106,456 @@ def test_sortiert_nach_aenderungszeit(tmp_path):
     result = find_untranscribed_recordings(tmp_path)
     assert result[0].name == "erste.wav"
     assert result[1].name == "zweite.mp3"
+
+
+def test_limit_liefert_nur_die_aeltesten(tmp_path):
+    for i, name in enumerate(["c.wav", "a.wav", "d.wav", "b.wav"]):
+        pfad = tmp_path / name
+        pfad.touch()
+        os.utime(pfad, (1000 + i, 1000 + i))
+
+    result = find_untranscribed_recordings(tmp_path, limit=2)
+    assert [f.name for f in result] == ["c.wav", "a.wav"]
+    assert len(find_untranscribed_recordings(tmp_path, limit=10)) == 4
+
+
+def test_scan_liefert_dateigroesse_mit(tmp_path):
+    (tmp_path / "aufnahme.wav").write_bytes(bytes(1234))
+    (tmp_path / "fertig.wav").write_bytes(bytes(10))
+    (tmp_path / "fertig.txt").write_text("transkribiert")
+    result = scan_untranscribed_recordings(tmp_path)
+    assert [(path.name, st.st_size) for path, st in result] == [("aufnahme.wav", 1234)]
+
+
+def test_mp3_befehl_ganze_datei_und_ausschnitt(tmp_path):
+    quelle = tmp_path / "aufnahme.wav"
+    ganz = build_mp3_cmd(quelle)
+    assert ganz[0] == "ffmpeg"
+    eingabe = ganz.index("-i")
+    assert ganz[eingabe + 1] == str(quelle)
+    assert ganz[-3:] == ["-f", "mp3", "pipe:1"]
+    assert "-ss" not in ganz
+
+    ausschnitt = build_mp3_cmd(quelle, 570.0, 600.0)
+    assert ausschnitt[eingabe + 2 : eingabe + 6] == ["-ss", "570.0", "-t", "600.0"]
+    assert ausschnitt[eingabe + 6 :] == ganz[eingabe + 2 :]
+
+
+def test_mp3_befehl_begrenzt_encoder_threads(tmp_path):
+    cmd = build_mp3_cmd(tmp_path / "aufnahme.wav")
+    # -threads ist nur nach -i eine Ausgabe-Option (Encoder), davor gilt es dem Decoder
+    assert cmd.index("-threads") > cmd.index("-i")
+    assert cmd[cmd.index("-threads") + 1] == "1"
+    assert cmd[cmd.index("-filter_threads") + 1] == "1"
+    assert "-nostdin" in cmd
+
+
+def test_format_size_einheiten():
+    assert format_size(0) == "0.0 B"
+    assert format_size(1023) == "1023.0 B"
+    assert format_size(1536) == "1.5 KB"
+    assert format_size(MAX_FILE_SIZE) == "25.0 MB"
+    assert format_size(2 * 1024**4) == "2.0 TB"
+    assert format_size(2048 * 1024**4) == "2048.0 TB"
+
+
+def test_bitrate_vorhersage_nach_dauer():
+    stunde = 3600
+    assert pick_mp3_bitrate(stunde) == "32k"
+    # 2 h passen nicht mehr mit 32 kbps (~28.8 MB), aber mit 24 kbps
+    assert pick_mp3_bitrate(2 * stunde) == "24k"
+    assert pick_mp3_bitrate(3 * stunde) == "16k"
+    # Zu lang für jede Bitrate: muss geteilt werden
+    assert pick_mp3_bitrate(5 * stunde) is None
+
+
+def test_mp3_befehl_mit_bitrate(tmp_path):
+    cmd = build_mp3_cmd(tmp_path / "lang.wav", bitrate="16k")
+    assert cmd[cmd.index("-b:a") + 1] == "16k"
+
+
+SILENCEDETECT_AUSGABE = """\
+[silencedetect @ 0x55d0c8a3f1c0] silence_start: 0
+[silencedetect @ 0x55d0c8a3f1c0] silence_end: 12.5 | silence_duration: 12.5
+size=N/A time=00:00:20.00 bitrate=N/A speed= 412x
+[silencedetect @ 0x55d0c8a3f1c0] silence_start: 15.25
+"""
+
+
+def test_stille_abschnitte_werden_summiert():
+    # 0-12.5 s Stille, 15.25 s bis Dateiende (20 s) Stille
+    assert parse_silence_duration(SILENCEDETECT_AUSGABE, 20.0) == 12.5 + 4.75
+
+
+def test_keine_stille_gemeldet():
+    assert parse_silence_duration("size=N/A time=00:01:00.00", 60.0) == 0.0
+
+
+def test_audio_digest_haengt_nur_vom_inhalt_ab(tmp_path):
+    original = tmp_path / "original.wav"
+    kopie = tmp_path / "umbenannt.mp3"
+    anders = tmp_path / "anders.wav"
+    original.write_bytes(b"RIFF" + bytes(3_000_000))
+    kopie.write_bytes(original.read_bytes())
+    anders.write_bytes(b"RIFF" + bytes(2_999_999) + b"x")
+    assert audio_digest(original) == audio_digest(kopie)
+    assert audio_digest(original) != audio_digest(anders)
+
+
+def test_transkriptions_cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    assert load_cached_transcript(cache_dir, "abc") is None
+    save_cached_transcript(cache_dir, "abc", "Hallo Welt")
+    assert load_cached_transcript(cache_dir, "abc") == "Hallo Welt"
+    assert [p.name for p in cache_dir.iterdir()] == ["abc-auto.txt"]
+
+
+def test_transkriptions_cache_beachtet_sprache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    save_cached_transcript(cache_dir, "abc", "Hello world", language="en")
+    assert load_cached_transcript(cache_dir, "abc", "en") == "Hello world"
+    assert load_cached_transcript(cache_dir, "abc", "de") is None
+    assert load_cached_transcript(cache_dir, "abc") is None
+
+
+def _api_fehler(status_code, headers=None, body=None):
+    response = SimpleNamespace(status_code=status_code, headers=headers or {}, request=None)
+    return APIStatusError("Fehler", response=response, body=body)
+
+
+def test_atomares_schreiben_hinterlaesst_keine_tempdatei(tmp_path):
+    ziel = tmp_path / "aufnahme.txt"
+    ziel.write_text("alt")
+    write_text_atomic(ziel, "Grüße", durable=True)
+    assert ziel.read_text(encoding="utf-8") == "Grüße"
+    assert [p.name for p in tmp_path.iterdir()] == ["aufnahme.txt"]
+
+
+def test_voruebergehende_fehler_werden_wiederholt():
+    assert is_retryable(_api_fehler(429))
+    assert is_retryable(_api_fehler(503))
+    assert is_retryable(APIConnectionError(request=None))
+    assert not is_retryable(_api_fehler(400))
+    assert not is_retryable(_api_fehler(401))
+    assert not is_retryable(ValueError("kaputt"))
+
+
+def test_fehlendes_guthaben_wird_nicht_wiederholt():
+    assert not is_retryable(_api_fehler(429, body={"code": "insufficient_quota"}))
+    assert is_retryable(_api_fehler(429, body={"code": "rate_limit_exceeded"}))
+
+
+def test_backoff_waechst_exponentiell_und_ist_begrenzt():
+    assert 1.0 <= retry_delay(0) <= 2.0
+    assert 4.0 <= retry_delay(2) <= 5.0
+    assert retry_delay(20) <= RETRY_MAX_DELAY + 1.0
+
+
+def test_retry_after_header_hat_vorrang():
+    assert retry_delay(0, _api_fehler(429, {"retry-after": "7"})) == 7.0
+    assert retry_delay(0, _api_fehler(429, {"retry-after": "9999"})) == RETRY_MAX_DELAY
+    assert 1.0 <= retry_delay(0, _api_fehler(429, {"retry-after": "bald"})) <= 2.0
+
+
+def test_retry_after_ms_hat_vorrang():
+    fehler = _api_fehler(429, {"retry-after-ms": "250", "retry-after": "7"})
+    assert retry_delay(0, fehler) == 0.25
+
+
+def _beobachte(batches, settle_time=0.05):
+    """Spielt Änderungs-Batches ([("touch"|"forget", pfad), ...]) ab, je 20 ms Abstand."""
+    verarbeitet = []
+
+    async def handle(path):
+        verarbeitet.append((path.name, path.read_bytes()))
+
+    async def ablauf():
+        watcher = RecordingWatcher(handle, settle_time)
+        for batch in batches:
+            for aktion, pfad in batch:
+                if callable(aktion):
+                    aktion()
+                else:
+                    getattr(watcher, aktion)(pfad)
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(settle_time * 3)
+
+    asyncio.run(ablauf())
+    return verarbeitet
+
+
+def test_watcher_wartet_bis_datei_unveraendert(tmp_path):
+    aufnahme = tmp_path / "aufnahme.wav"
+    aufnahme.write_bytes(b"1")
+
+    def weiterschreiben():
+        with open(aufnahme, "ab") as f:
+            f.write(b"2")
+
+    # Drei Änderungen innerhalb der Wartezeit: erst danach genau eine Verarbeitung
+    batches = [[("touch", aufnahme)]] + [[(weiterschreiben, None), ("touch", aufnahme)]] * 3
+    assert _beobachte(batches) == [("aufnahme.wav", b"1222")]
+
+
+def test_watcher_verwirft_geloeschte_dateien(tmp_path):
+    weg = tmp_path / "weg.wav"
+    weg.write_bytes(b"x")
+    assert _beobachte([[("touch", weg)], [(weg.unlink, None), ("forget", weg)]]) == []
+
+
+def test_watcher_ueberspringt_transkribierte_und_fehlende(tmp_path):
+    fertig = tmp_path / "fertig.wav"
+    fertig.write_bytes(b"x")
+    (tmp_path / "fertig.txt").write_text("transkribiert")
+    fehlt = tmp_path / "fehlt.wav"
+    assert _beobachte([[("touch", fertig), ("touch", fehlt)]]) == []
+
+
+class FakeTranscriptions:
+    """Ersetzt client.audio.transcriptions: merkt sich jeden Upload."""
+
+    def __init__(self, fehler=(), verzoegerung=0.0):
+        self.fehler = list(fehler)
+        self.verzoegerung = verzoegerung
+        self.uploads = []
+        self.laufend = 0
+        self.hoechstens = 0
+
+    async def create(self, **kwargs):
+        name, inhalt = kwargs["file"]
+        if not isinstance(inhalt, bytes):
+            inhalt = inhalt.read()
+        self.uploads.append((name, inhalt))
+        nummer = len(self.uploads)
+        self.laufend += 1
+        self.hoechstens = max(self.hoechstens, self.laufend)
+        try:
+            await asyncio.sleep(self.verzoegerung)
+        finally:
+            self.laufend -= 1
+        if self.fehler:
+            raise self.fehler.pop(0)
+        return SimpleNamespace(text=f"Text {nummer}")
+
+
+def _fake_client(**kwargs):
+    transcriptions = FakeTranscriptions(**kwargs)
+    return SimpleNamespace(audio=SimpleNamespace(transcriptions=transcriptions)), transcriptions
+
+
+def test_konvertierungen_durch_semaphore_begrenzt(tmp_path, monkeypatch):
+    laufend = 0
+    hoechststand = 0
+
+    def fake_prepare(input_path, duration=None):
+        nonlocal laufend, hoechststand
+        laufend += 1
+        hoechststand = max(hoechststand, laufend)
+        time.sleep(0.05)
+        laufend -= 1
+        return [b"mp3"]
+
+    monkeypatch.setattr(transcribe, "MAX_FILE_SIZE", 1)
+    monkeypatch.setattr(transcribe, "get_audio_duration", lambda path: 60.0)
+    monkeypatch.setattr(transcribe, "prepare_mp3_segments", fake_prepare)
+    dateien = []
+    for i in range(6):
+        pfad = tmp_path / f"lang{i}.wav"
+        pfad.write_bytes(b"RIFF....")
+        dateien.append(pfad)
+    client, _ = _fake_client()
+
+    async def ablauf():
+        semaphore = asyncio.Semaphore(6)
+        convert_semaphore = asyncio.Semaphore(2)
+        await asyncio.gather(
+            *(
+                process_file(client, pfad, None, semaphore, convert_semaphore=convert_semaphore)
+                for pfad in dateien
+            )
+        )
+
+    asyncio.run(ablauf())
+    assert hoechststand == 2
+    assert all(pfad.with_suffix(".txt").exists() for pfad in dateien)
+
+
+def _ohne_wartezeit(monkeypatch):
+    monkeypatch.setattr(transcribe, "RETRY_BASE_DELAY", 0.0)
+    monkeypatch.setattr(transcribe, "RETRY_JITTER", 0.0)
+
+
+def test_upload_wird_nach_fehlern_vollstaendig_wiederholt(tmp_path, monkeypatch):
+    _ohne_wartezeit(monkeypatch)
+    aufnahme = tmp_path / "aufnahme.wav"
+    aufnahme.write_bytes(b"RIFF" + bytes(1000))
+    client, transcriptions = _fake_client(
+        fehler=[_api_fehler(503), APIConnectionError(request=None)]
+    )
+
+    text = asyncio.run(transcribe_file(client, aufnahme, max_retries=3))
+
+    assert text == "Text 3"
+    # Vor jedem Versuch zurückgespult: immer der komplette Inhalt
+    assert transcriptions.uploads == [("aufnahme.wav", aufnahme.read_bytes())] * 3
+
+
+def test_wiederholungen_sind_begrenzt(tmp_path, monkeypatch):
+    _ohne_wartezeit(monkeypatch)
+    client, transcriptions = _fake_client(fehler=[_api_fehler(500)] * 5)
+
+    with pytest.raises(APIStatusError):
+        asyncio.run(
+            transcribe_file(client, tmp_path / "teil.mp3", content=b"mp3", max_retries=2)
+        )
+    assert len(transcriptions.uploads) == 3
+
+
+def test_dauerhafte_fehler_werden_nicht_wiederholt(tmp_path, monkeypatch):
+    _ohne_wartezeit(monkeypatch)
+    client, transcriptions = _fake_client(
+        fehler=[_api_fehler(429, body={"code": "insufficient_quota"})]
+    )
+
+    with pytest.raises(APIStatusError):
+        asyncio.run(transcribe_file(client, tmp_path / "teil.mp3", content=b"mp3"))
+    assert len(transcriptions.uploads) == 1
+
+
+def test_stilleerkennung_vertraegt_kaputtes_utf8(tmp_path, monkeypatch):
+    # Falsches ffmpeg: Metadaten in Latin-1, danach die silencedetect-Zeilen
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text(
+        "#!/bin/sh\n"
+        "printf 'title: M\\374ll\\n' >&2\n"
+        "printf '[silencedetect] silence_start: 0\\n' >&2\n"
+        "printf '[silencedetect] silence_end: 60 | silence_duration: 60\\n' >&2\n"
+    )
+    ffmpeg.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    assert is_effectively_silent(tmp_path / "stumm.wav", duration=60.0)
+
+
+def test_stumme_aufnahme_wird_ohne_api_aufruf_erledigt(tmp_path, monkeypatch):
+    aufnahme = tmp_path / "stumm.wav"
+    aufnahme.write_bytes(bytes(1000))
+    monkeypatch.setattr(transcribe, "get_audio_duration", lambda path: 60.0)
+    monkeypatch.setattr(transcribe, "is_effectively_silent", lambda path, duration: True)
+    client, transcriptions = _fake_client()
+
+    asyncio.run(
+        process_file(client, aufnahme, None, asyncio.Semaphore(1), skip_silence=True)
+    )
+
+    assert transcriptions.uploads == []
+    # Leere .txt: die Aufnahme gilt als erledigt und wird nicht erneut geprüft
+    assert aufnahme.with_suffix(".txt").read_text() == ""
+
+
+def _aufnahmen(verzeichnis, anzahl):
+    pfade = []
+    for i in range(anzahl):
+        pfad = verzeichnis / f"aufnahme{i}.wav"
+        pfad.write_bytes(b"RIFF" + bytes([i]) * 100)
+        pfade.append(pfad)
+    return pfade
+
+
+def _fake_openai(monkeypatch, transcriptions):
+    """Lässt process_files den Fake-Client statt AsyncOpenAI benutzen."""
+    import openai
+
+    class FakeAsyncOpenAI:
+        def __init__(self, **kwargs):
+            self.audio = SimpleNamespace(transcriptions=transcriptions)
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(openai, "AsyncOpenAI", FakeAsyncOpenAI)
+    monkeypatch.setattr(openai, "DefaultAsyncHttpxClient", lambda **kwargs: None)
+    # process_files importiert httpx nur für die Pool-Limits
+    monkeypatch.setitem(sys.modules, "httpx", SimpleNamespace(Limits=lambda **kwargs: None))
+
+
+def test_kleine_datei_wird_direkt_hochgeladen(tmp_path):
+    (aufnahme,) = _aufnahmen(tmp_path, 1)
+    cache = tmp_path / "cache"
+    client, transcriptions = _fake_client()
+
+    asyncio.run(
+        process_file(client, aufnahme, "de", asyncio.Semaphore(1), cache_dir=cache)
+    )
+
+    assert transcriptions.uploads == [("aufnahme0.wav", aufnahme.read_bytes())]
+    assert aufnahme.with_suffix(".txt").read_text(encoding="utf-8") == "Text 1"
+    assert load_cached_transcript(cache, audio_digest(aufnahme), "de") == "Text 1"
+
+
+def test_cache_treffer_ueberspringt_api(tmp_path):
+    (aufnahme,) = _aufnahmen(tmp_path, 1)
+    cache = tmp_path / "cache"
+    save_cached_transcript(cache, audio_digest(aufnahme), "Schon bekannt", language="de")
+    client, transcriptions = _fake_client()
+
+    asyncio.run(
+        process_file(client, aufnahme, "de", asyncio.Semaphore(1), cache_dir=cache)
+    )
+
+    assert transcriptions.uploads == []
+    assert aufnahme.with_suffix(".txt").read_text(encoding="utf-8") == "Schon bekannt"
+
+
+def test_grosse_datei_wird_in_segmenten_hochgeladen(tmp_path, monkeypatch):
+    (aufnahme,) = _aufnahmen(tmp_path, 1)
+    aufrufe = []
+
+    def segmente(path, duration):
+        aufrufe.append((path, duration))
+        return [b"erstes", b"zweites"]
+
+    monkeypatch.setattr(transcribe, "MAX_FILE_SIZE", 10)
+    monkeypatch.setattr(transcribe, "get_audio_duration", lambda path: 1200.0)
+    monkeypatch.setattr(transcribe, "prepare_mp3_segments", segmente)
+    client, transcriptions = _fake_client()
+
+    asyncio.run(process_file(client, aufnahme, None, asyncio.Semaphore(1)))
+
+    assert aufrufe == [(aufnahme, 1200.0)]
+    assert transcriptions.uploads == [("aufnahme0.mp3", b"erstes"), ("aufnahme0.mp3", b"zweites")]
+    erwartet = transcribe.find_overlap_and_merge(["Text 1", "Text 2"])
+    assert aufnahme.with_suffix(".txt").read_text(encoding="utf-8") == erwartet
+
+
+def test_parallele_dateien_durch_semaphore_begrenzt(tmp_path, monkeypatch):
+    aufnahmen = _aufnahmen(tmp_path, 5)
+    transcriptions = FakeTranscriptions(verzoegerung=0.05)
+    _fake_openai(monkeypatch, transcriptions)
+
+    files = scan_untranscribed_recordings(tmp_path)
+    asyncio.run(transcribe.process_files("key", files, None, 2))
+
+    assert len(transcriptions.uploads) == 5
+    assert transcriptions.hoechstens == 2
+    assert all(pfad.with_suffix(".txt").exists() for pfad in aufnahmen)
+
+
+def test_fehler_einer_datei_wird_protokolliert(tmp_path, monkeypatch, caplog):
+    weg, bleibt = _aufnahmen(tmp_path, 2)
+    transcriptions = FakeTranscriptions()
+    _fake_openai(monkeypatch, transcriptions)
+
+    # Zwischen Scan und Verarbeitung gelöscht: der Cache-Hash schlägt fehl
+    files = scan_untranscribed_recordings(tmp_path)
+    weg.unlink()
+    with caplog.at_level("ERROR", logger=transcribe.logger.name):
+        asyncio.run(
+            transcribe.process_files("key", files, None, 2, cache_dir=tmp_path / "cache")
+        )
+
+    assert f"{weg.name}: Fehler bei Verarbeitung" in caplog.text
+    assert bleibt.with_suffix(".txt").read_text(encoding="utf-8") == "Text 1"
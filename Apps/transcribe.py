@@ -2,7 +2,9 @@
 # /// script
 # requires-python = ">=3.11"
 # dependencies = [
-#     "openai>=1.0.0",
+#     "httpx",
+#     "openai>=1.17.0",
+#     "watchfiles>=0.18",
 # ]
 # ///
 
@@ -15,54 +17,108 @@ Anforderungen: siehe ../Anforderungen/transcribe.md
 """
 
 import argparse
+import asyncio
+import contextlib
+import hashlib
+import heapq
 import logging
+import math
 import os
+import random
 import re
-import shutil
 import subprocess
 import sys
-import tempfile
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from openai import OpenAI
+# openai wird erst bei Bedarf importiert (bringt httpx, pydantic, ... mit),
+# damit --help und frühe Fehlerausgänge nicht auf den Import warten
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 # Ermittle das Verzeichnis des Scripts (Repository-Root)
 SCRIPT_DIR = Path(__file__).parent.parent
 DEFAULT_RECORDINGS_DIR = SCRIPT_DIR / "Recordings"
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[logging.StreamHandler(sys.stdout)],
-)
+# Cache für Transkriptionen, Schlüssel ist ein Hash des Audio-Inhalts
+CACHE_DIR = SCRIPT_DIR / ".transcribe_cache"
+
 logger = logging.getLogger(__name__)
 
 # Unterstützte Audio-Formate
 SUPPORTED_FORMATS = {".mp3", ".mp4", ".mpeg", ".mpga", ".m4a", ".wav", ".webm"}
 
+# Einheiten für format_size (1024er-Schritte)
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
 # Max. Dateigröße für OpenAI API (25 MB)
 MAX_FILE_SIZE = 25 * 1024 * 1024
 
-# Bitrate für MP3-Konvertierung (64 kbps ist ausreichend für Sprache)
-MP3_BITRATE = "64k"
+# Bitraten für MP3-Konvertierung in kbps, absteigend (gültige MPEG-2-Bitraten bei
+# 16 kHz). 32 kbps mono ist ausreichend für Sprache, die niedrigeren Stufen werden
+# nur genommen, wenn eine lange Aufnahme sonst nicht in MAX_FILE_SIZE passt.
+MP3_BITRATES = (32, 24, 16)
+MP3_BITRATE = f"{MP3_BITRATES[0]}k"
+
+# Sicherheitsabstand zu MAX_FILE_SIZE bei der Größenvorhersage (Header, Frames)
+MP3_SIZE_HEADROOM = 0.9
+
+# ffmpeg-Optionen für Sprache: Whisper rechnet intern ohnehin mit 16 kHz mono,
+# höhere Abtastraten, Stereo und Video-Spuren kosten nur Rechenzeit und Upload
+FFMPEG_VOICE_ARGS = ["-vn", "-ac", "1", "-ar", "16000", "-c:a", "libmp3lame"]
+
+# Wiederholungen bei vorübergehenden API-Fehlern (Rate-Limit, 5xx, Verbindungsabbruch)
+DEFAULT_MAX_RETRIES = 5
+RETRY_BASE_DELAY = 1.0  # Sekunden, verdoppelt sich pro Versuch
+RETRY_MAX_DELAY = 60.0
+RETRY_JITTER = 1.0
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+# Fehlercodes, die trotz wiederholbarem Status dauerhaft sind (429 ohne Guthaben)
+NON_RETRYABLE_ERROR_CODES = {"insufficient_quota"}
+
+# Blockgröße beim Hashen von Audio-Dateien (1 MiB)
+HASH_CHUNK_SIZE = 1 << 20
+
+# Anzahl gleichzeitig verarbeiteter Dateien (parallele API-Anfragen)
+DEFAULT_CONCURRENCY = 4
+
+# --watch: so lange (Sekunden) muss eine neue Datei unverändert bleiben, bevor sie
+# als fertig geschrieben gilt und transkribiert wird
+WATCH_SETTLE_TIME = 2.0
+
+# Anzahl gleichzeitiger ffmpeg-Konvertierungen (je ein Thread, CPU-gebunden)
+DEFAULT_CONVERT_JOBS = max(1, (os.cpu_count() or 2) // 2)
+
+# Wie lange ungenutzte API-Verbindungen offen bleiben (Sekunden). Der SDK-Standard
+# von 5 s ist kürzer als eine ffmpeg-Konvertierung, dann kostet jeder Upload einen
+# neuen TLS-Handshake.
+HTTP_KEEPALIVE_EXPIRY = 60.0
 
 # Segment-Länge in Sekunden (10 Minuten = 600 Sekunden)
-# Bei 64 kbps ergibt das ca. 4.8 MB pro Segment
+# Bei 32 kbps ergibt das ca. 2.4 MB pro Segment
 SEGMENT_DURATION = 600
 
 # Überlappung in Sekunden (30 Sekunden Überlappung für saubere Übergänge)
 SEGMENT_OVERLAP = 30
 
+# --skip-silence: Pegel und Mindestlänge für ffmpeg silencedetect; eine Datei gilt
+# als stumm, wenn mindestens SILENCE_RATIO ihrer Dauer Stille ist
+SILENCE_NOISE_DB = -40
+SILENCE_MIN_DURATION = 1.0
+SILENCE_RATIO = 0.95
+
+# Ausgabe von silencedetect, z.B.: [silencedetect @ 0x...] silence_end: 12.5 | ...
+SILENCE_MARKER = re.compile(r"silence_(start|end): (-?\d+(?:\.\d+)?)")
+
 
 def format_size(bytes_size: int) -> str:
     """Formatiert Bytes als lesbare Größe."""
-    for unit in ["B", "KB", "MB", "GB"]:
-        if bytes_size < 1024:
-            return f"{bytes_size:.1f} {unit}"
-        bytes_size /= 1024
-    return f"{bytes_size:.1f} TB"
+    if bytes_size <= 0:
+        return "0.0 B"
+    # Einheit direkt aus der Bitlänge: je 10 Bit eine Einheit weiter (1024er-Schritte)
+    idx = min((bytes_size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{bytes_size / (1 << (idx * 10)):.1f} {SIZE_UNITS[idx]}"
 
 
 def get_audio_duration(file_path: Path) -> float | None:
@@ -91,56 +147,160 @@ def get_audio_duration(file_path: Path) -> float | None:
         return None
 
 
-def convert_to_mp3(input_path: Path, output_path: Path) -> bool:
+def parse_silence_duration(ffmpeg_output: str, duration: float) -> float:
     """
-    Konvertiert eine Audio-Datei zu MP3 mit ffmpeg.
+    Summiert die von ffmpeg silencedetect gemeldeten Stille-Abschnitte (Sekunden).
 
-    Args:
-        input_path: Pfad zur Eingabedatei
-        output_path: Pfad zur Ausgabedatei
+    Ein silence_start ohne folgendes silence_end bedeutet Stille bis zum
+    Ende der Datei.
+    """
+    silent = 0.0
+    start = None
+    for kind, value in SILENCE_MARKER.findall(ffmpeg_output):
+        if kind == "start":
+            start = max(float(value), 0.0)
+        elif start is not None:
+            silent += float(value) - start
+            start = None
+    if start is not None:
+        silent += max(duration - start, 0.0)
+    return silent
+
+
+def is_effectively_silent(input_path: Path, duration: float | None = None) -> bool:
+    """
+    Prüft mit ffmpeg silencedetect, ob eine Aufnahme (fast) nur Stille enthält.
 
-    Returns:
-        True wenn erfolgreich, False sonst
+    Der Durchlauf dekodiert nur und schreibt nichts (-f null), das ist deutlich
+    schneller als Echtzeit und billiger als ein API-Aufruf für tote Luft.
+    Im Zweifel (ffprobe/ffmpeg fehlgeschlagen) gilt die Datei als nicht stumm.
     """
-    logger.info(f"Konvertiere zu MP3 ({MP3_BITRATE})...")
+    if duration is None:
+        duration = get_audio_duration(input_path)
+    if not duration:
+        return False
 
     try:
         result = subprocess.run(
             [
                 "ffmpeg",
+                "-nostdin",
+                "-hide_banner",
+                "-nostats",
                 "-i", str(input_path),
-                "-b:a", MP3_BITRATE,
-                "-y",  # Überschreibe ohne Nachfrage
-                str(output_path),
+                "-af", f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_DURATION}",
+                "-f", "null",
+                "-",
             ],
             capture_output=True,
             text=True,
+            # Metadaten (z.B. Titel) sind nicht immer gültiges UTF-8
+            errors="replace",
         )
+    except FileNotFoundError:
+        return False
+    if result.returncode != 0:
+        return False
+
+    return parse_silence_duration(result.stderr, duration) >= SILENCE_RATIO * duration
+
+
+def pick_mp3_bitrate(duration: float) -> str | None:
+    """
+    Wählt die höchste Bitrate aus MP3_BITRATES, bei der eine Aufnahme der
+    angegebenen Dauer (Sekunden) voraussichtlich in MAX_FILE_SIZE passt.
+
+    Die Größe ergibt sich bei konstanter Bitrate direkt aus der Dauer. So wird
+    vorab entschieden, ob eine einzelne Konvertierung reicht - statt erst
+    komplett zu konvertieren und danach festzustellen, dass doch geteilt
+    werden muss.
+
+    Returns:
+        Bitrate für ffmpeg (z.B. "24k") oder None, wenn geteilt werden muss
+    """
+    limit = MAX_FILE_SIZE * MP3_SIZE_HEADROOM
+    for kbps in MP3_BITRATES:
+        if kbps * 1000 / 8 * duration <= limit:
+            return f"{kbps}k"
+    return None
+
+
+def build_mp3_cmd(
+    input_path: Path,
+    start: float | None = None,
+    length: float | None = None,
+    bitrate: str = MP3_BITRATE,
+) -> list[str]:
+    """
+    Baut den ffmpeg-Aufruf, der (einen Ausschnitt von) input_path als
+    Sprach-MP3 nach stdout schreibt.
+
+    Wird von convert_to_mp3_stream() und split_audio_to_segments() genutzt,
+    damit Preset und Bitrate nur an einer Stelle stehen.
+    """
+    # Ein Thread pro ffmpeg: parallel laufen mehrere Konvertierungen, nicht Threads.
+    # -filter_threads gilt global (Resampling), -threads nach -i für den Encoder.
+    # -nostdin: ffmpeg soll nicht am Terminal mitlesen (z.B. im Watch-Modus).
+    cmd = ["ffmpeg", "-nostdin", "-filter_threads", "1", "-i", str(input_path)]
+    if start is not None:
+        cmd += ["-ss", str(start)]
+    if length is not None:
+        cmd += ["-t", str(length)]
+    return [
+        *cmd,
+        "-threads", "1",
+        *FFMPEG_VOICE_ARGS,
+        "-b:a", bitrate,
+        "-f", "mp3",
+        "pipe:1",
+    ]
+
+
+def convert_to_mp3_stream(input_path: Path, bitrate: str = MP3_BITRATE) -> bytes | None:
+    """
+    Konvertiert eine Audio-Datei zu MP3 mit ffmpeg.
+
+    ffmpeg schreibt das MP3 nach stdout (pipe:1), der Inhalt wird direkt im
+    Speicher weitergegeben - ohne Umweg über eine temporäre Datei.
+
+    Args:
+        input_path: Pfad zur Eingabedatei
+        bitrate: MP3-Bitrate für ffmpeg (z.B. "32k")
+
+    Returns:
+        MP3-Inhalt oder None bei Fehler
+    """
+    logger.info("Konvertiere zu MP3 (%s)...", bitrate)
+
+    try:
+        result = subprocess.run(build_mp3_cmd(input_path, bitrate=bitrate), capture_output=True)
         if result.returncode != 0:
-            logger.error(f"ffmpeg Fehler: {result.stderr}")
-            return False
-        return True
+            logger.error("ffmpeg Fehler: %s", result.stderr.decode(errors="replace"))
+            return None
+        return result.stdout
     except FileNotFoundError:
         logger.error("ffmpeg nicht gefunden!")
         logger.error("Bitte installieren: sudo apt install ffmpeg")
-        return False
+        return None
 
 
-def split_audio_to_segments(input_path: Path, temp_dir: Path) -> list[Path]:
+def split_audio_to_segments(input_path: Path, duration: float | None = None) -> list[bytes]:
     """
     Teilt eine Audio-Datei in überlappende Segmente und konvertiert zu MP3.
 
     Die Segmente überlappen sich um SEGMENT_OVERLAP Sekunden, damit keine
-    Wörter an den Übergangsstellen abgeschnitten werden.
+    Wörter an den Übergangsstellen abgeschnitten werden. Wie bei
+    convert_to_mp3_stream() liefert ffmpeg die Segmente über stdout.
 
     Args:
         input_path: Pfad zur Eingabedatei
-        temp_dir: Verzeichnis für temporäre Segment-Dateien
+        duration: Optional: bereits ermittelte Dauer in Sekunden (sonst ffprobe)
 
     Returns:
-        Liste der Segment-Dateipfade (sortiert nach Reihenfolge)
+        Liste der MP3-Inhalte der Segmente (sortiert nach Reihenfolge)
     """
-    duration = get_audio_duration(input_path)
+    if duration is None:
+        duration = get_audio_duration(input_path)
     if duration is None:
         logger.error("Konnte Audio-Dauer nicht ermitteln")
         return []
@@ -155,42 +315,33 @@ def split_audio_to_segments(input_path: Path, temp_dir: Path) -> list[Path]:
         start += step
 
     num_segments = len(segment_starts)
-    logger.info(f"Audio-Dauer: {duration/60:.1f} Minuten - teile in {num_segments} überlappende Segment(e)")
+    logger.info(
+        "Audio-Dauer: %.1f Minuten - teile in %d überlappende Segment(e)", duration / 60, num_segments
+    )
 
     segments = []
     for i, start_time in enumerate(segment_starts):
-        segment_path = temp_dir / f"segment_{i:03d}.mp3"
-
         # Für das letzte Segment: bis zum Ende
         remaining = duration - start_time
         segment_len = min(SEGMENT_DURATION, remaining)
 
-        logger.info(f"Erstelle Segment {i+1}/{num_segments} (ab {start_time/60:.1f} min)...")
+        logger.info("Erstelle Segment %d/%d (ab %.1f min)...", i + 1, num_segments, start_time / 60)
 
         try:
             result = subprocess.run(
-                [
-                    "ffmpeg",
-                    "-i", str(input_path),
-                    "-ss", str(start_time),
-                    "-t", str(segment_len),
-                    "-b:a", MP3_BITRATE,
-                    "-y",
-                    str(segment_path),
-                ],
+                build_mp3_cmd(input_path, start_time, segment_len),
                 capture_output=True,
-                text=True,
             )
             if result.returncode != 0:
-                logger.error(f"ffmpeg Fehler bei Segment {i+1}: {result.stderr}")
+                logger.error(
+                    "ffmpeg Fehler bei Segment %d: %s", i + 1, result.stderr.decode(errors="replace")
+                )
                 continue
 
-            segment_size = segment_path.stat().st_size
-            if segment_size > 0:
-                segments.append(segment_path)
-                logger.info(f"  Segment {i+1}: {format_size(segment_size)}")
-            else:
-                segment_path.unlink(missing_ok=True)
+            if result.stdout:
+                segments.append(result.stdout)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("  Segment %d: %s", i + 1, format_size(len(result.stdout)))
 
         except FileNotFoundError:
             logger.error("ffmpeg nicht gefunden!")
@@ -199,6 +350,45 @@ def split_audio_to_segments(input_path: Path, temp_dir: Path) -> list[Path]:
     return segments
 
 
+def prepare_mp3_segments(input_path: Path, duration: float | None = None) -> list[bytes]:
+    """
+    Konvertiert eine zu große Audio-Datei zu MP3, bei Bedarf in Segmenten.
+
+    Anhand der Dauer (per ffprobe ermittelt) wird vorab abgeschätzt, ob eine
+    einzelne MP3 passt und mit welcher Bitrate. Ohne Dauer wird es mit der
+    Standard-Bitrate versucht.
+
+    Returns:
+        MP3-Inhalte (eine Datei oder mehrere Segmente), leer bei Fehler
+    """
+    bitrate = MP3_BITRATE if duration is None else pick_mp3_bitrate(duration)
+
+    if bitrate is None:
+        logger.info(
+            "%s: %.1f Minuten passen auch mit %dk nicht in eine Datei - teile in Segmente...",
+            input_path.name,
+            duration / 60,
+            MP3_BITRATES[-1],
+        )
+        return split_audio_to_segments(input_path, duration)
+
+    mp3_data = convert_to_mp3_stream(input_path, bitrate)
+    if mp3_data is None:
+        # Konvertierung fehlgeschlagen
+        return []
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Konvertiert: %s", format_size(len(mp3_data)))
+
+    if len(mp3_data) <= MAX_FILE_SIZE:
+        # Passt als einzelne Datei
+        return [mp3_data]
+
+    # Trotz Vorhersage zu groß - in Segmente teilen
+    logger.info("Immer noch zu groß - teile in Segmente...")
+    del mp3_data
+    return split_audio_to_segments(input_path, duration)
+
+
 def find_overlap_and_merge(texts: list[str]) -> str:
     """
     Fügt überlappende Transkriptions-Texte zusammen.
@@ -288,59 +478,500 @@ def _words_match(words1: list[str], words2: list[str]) -> bool:
     return True
 
 
-def find_untranscribed_recordings(directory: Path) -> list[Path]:
-    """Findet alle Audio-Dateien ohne entsprechende .txt-Datei."""
-    audio_files = []
-    for ext in SUPPORTED_FORMATS:
-        audio_files.extend(directory.glob(f"*{ext}"))
+def scan_untranscribed_recordings(
+    directory: Path, limit: int | None = None
+) -> list[tuple[Path, os.stat_result]]:
+    """
+    Findet alle Audio-Dateien ohne entsprechende .txt-Datei, zusammen mit
+    ihrem stat-Ergebnis.
+
+    Das Verzeichnis wird in einem einzigen os.scandir-Durchlauf gelesen,
+    der gleichzeitig die Audio-Dateien und die vorhandenen .txt-Dateien
+    sammelt. Endungen werden unabhängig von Groß-/Kleinschreibung erkannt.
+    Jede Datei wird genau einmal ge-stat-tet; Aufrufer verwenden das
+    Ergebnis weiter, statt die Datei erneut abzufragen.
+
+    Mit limit werden nur die `limit` ältesten Dateien geliefert (Teilsortierung
+    per Heap statt vollständigem Sortieren).
+    """
+    audio_entries = []
+    transcribed_stems = set()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            stem, dot, ext = entry.name.rpartition(".")
+            if not dot:
+                continue
+            suffix = f".{ext}"
+            if suffix == ".txt":
+                transcribed_stems.add(stem)
+            elif suffix.lower() in SUPPORTED_FORMATS and entry.is_file():
+                audio_entries.append((stem, entry))
 
     # Nur Dateien ohne .txt-Entsprechung
     untranscribed = [
-        f for f in audio_files
-        if not f.with_suffix(".txt").exists()
+        (Path(entry.path), entry.stat())
+        for stem, entry in audio_entries
+        if stem not in transcribed_stems
     ]
 
     # Sortiere nach Änderungszeit (älteste zuerst)
-    untranscribed.sort(key=lambda f: f.stat().st_mtime)
-    return untranscribed
+    def by_mtime(item):
+        return item[1].st_mtime
+
+    if limit is not None:
+        return heapq.nsmallest(limit, untranscribed, key=by_mtime)
+    return sorted(untranscribed, key=by_mtime)
+
+
+def find_untranscribed_recordings(directory: Path, limit: int | None = None) -> list[Path]:
+    """Findet alle Audio-Dateien ohne entsprechende .txt-Datei (älteste zuerst)."""
+    return [path for path, _ in scan_untranscribed_recordings(directory, limit)]
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Prüft, ob ein API-Fehler vorübergehend ist und ein neuer Versuch lohnt.
 
+    Ein 429 wegen aufgebrauchten Guthabens (insufficient_quota) ist dauerhaft
+    und wird nicht wiederholt - sonst würde die Datei umsonst erneut hochgeladen.
+    """
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, APIStatusError):
+        if error.code in NON_RETRYABLE_ERROR_CODES:
+            return False
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def retry_delay(attempt: int, error: Exception | None = None) -> float:
+    """
+    Berechnet die Wartezeit vor dem nächsten Versuch.
 
-def transcribe_file(
-    client: OpenAI,
+    Exponentielles Backoff (begrenzt auf RETRY_MAX_DELAY) mit zufälligem
+    Jitter. Ein Retry-After-Header der API (retry-after-ms vor retry-after)
+    hat Vorrang.
+    """
+    response = getattr(error, "response", None)
+    if response is not None:
+        for header, divisor in (("retry-after-ms", 1000), ("retry-after", 1)):
+            try:
+                delay = float(response.headers.get(header, "")) / divisor
+            except ValueError:
+                continue
+            if math.isfinite(delay) and delay >= 0:
+                return min(delay, RETRY_MAX_DELAY)
+    return min(RETRY_BASE_DELAY * 2**attempt, RETRY_MAX_DELAY) + random.uniform(0, RETRY_JITTER)
+
+
+async def transcribe_file(
+    client: "AsyncOpenAI",
     file_path: Path,
     language: str | None = None,
+    content: bytes | None = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
 ) -> str:
     """
     Transkribiert eine Audio-Datei mit der OpenAI Whisper API.
 
+    Vorübergehende Fehler (Rate-Limit, Serverfehler, Verbindungsabbruch)
+    werden bis zu max_retries-mal mit exponentiellem Backoff wiederholt.
+
     Args:
-        client: OpenAI-Client
-        file_path: Pfad zur Audio-Datei
+        client: OpenAI-Client (async)
+        file_path: Pfad zur Audio-Datei (mit content nur als Dateiname verwendet)
         language: Optional: Sprache (z.B. "de", "en")
+        content: Optional: Audio-Inhalt im Speicher (z.B. MP3 von ffmpeg),
+            der statt der Datei gesendet wird
+        max_retries: Anzahl zusätzlicher Versuche nach einem Fehler
 
     Returns:
         Transkribierter Text
     """
-    logger.info(f"Sende an OpenAI Whisper API...")
+    from openai import APIConnectionError, APIStatusError
 
-    start_time = time.time()
+    logger.info("Sende an OpenAI Whisper API: %s...", file_path.name)
 
-    with open(file_path, "rb") as audio_file:
-        kwargs = {
-            "model": "whisper-1",
-            "file": audio_file,
-        }
-        if language:
-            kwargs["language"] = language
+    start_time = time.time()
 
-        response = client.audio.transcriptions.create(**kwargs)
+    kwargs = {
+        "model": "whisper-1",
+    }
+    if language:
+        kwargs["language"] = language
+
+    with contextlib.ExitStack() as stack:
+        if content is None:
+            # Das Datei-Objekt wird direkt übergeben: httpx liest es beim Senden
+            # blockweise, statt die ganze Datei vorab in den Speicher zu laden
+            audio_file = stack.enter_context(open(file_path, "rb"))
+            # Sequentielles Lesen ankündigen (größeres Read-Ahead des Kernels)
+            os.posix_fadvise(audio_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            kwargs["file"] = (file_path.name, audio_file)
+        else:
+            audio_file = None
+            kwargs["file"] = (file_path.name, content)
+
+        for attempt in range(max_retries + 1):
+            if audio_file is not None:
+                audio_file.seek(0)
+            try:
+                response = await client.audio.transcriptions.create(**kwargs)
+                break
+            except (APIConnectionError, APIStatusError) as e:
+                if attempt == max_retries or not is_retryable(e):
+                    raise
+                delay = retry_delay(attempt, e)
+                logger.warning(
+                    "%s: %s - neuer Versuch in %.1f s (%d/%d)",
+                    file_path.name,
+                    e,
+                    delay,
+                    attempt + 1,
+                    max_retries,
+                )
+                await asyncio.sleep(delay)
 
     duration = time.time() - start_time
-    logger.info(f"Transkription erfolgreich ({duration:.1f} Sekunden)")
+    logger.info("Transkription erfolgreich (%.1f Sekunden)", duration)
 
     return response.text
 
 
+def audio_digest(file_path: Path) -> str:
+    """Berechnet einen BLAKE2b-Hash über den Inhalt einer Audio-Datei."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_transcript_path(cache_dir: Path, digest: str, language: str | None = None) -> Path:
+    """
+    Pfad eines Cache-Eintrags. Die Sprache gehört zum Schlüssel, damit ein
+    Lauf mit --language nicht die Transkription eines Laufs mit anderer
+    (oder automatisch erkannter) Sprache übernimmt.
+    """
+    return cache_dir / f"{digest}-{language or 'auto'}.txt"
+
+
+def load_cached_transcript(
+    cache_dir: Path, digest: str, language: str | None = None
+) -> str | None:
+    """Liest eine zwischengespeicherte Transkription oder gibt None zurück."""
+    try:
+        return cached_transcript_path(cache_dir, digest, language).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def write_text_atomic(path: Path, text: str, durable: bool = False) -> None:
+    """
+    Schreibt Text atomar: erst in eine temporäre Datei daneben, die dann
+    per os.replace umbenannt wird. Ein Abbruch mitten im Schreiben hinterlässt
+    so nie eine halbe Datei unter dem endgültigen Namen.
+
+    Mit durable=True werden Datei und Verzeichnis vor bzw. nach dem
+    Umbenennen per fsync auf die Platte geschrieben (übersteht auch einen
+    Stromausfall, kostet aber Zeit).
+    """
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(text.encode("utf-8"))
+        if durable:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if durable:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def save_cached_transcript(
+    cache_dir: Path,
+    digest: str,
+    text: str,
+    durable: bool = False,
+    language: str | None = None,
+) -> None:
+    """
+    Speichert eine Transkription im Cache.
+
+    Atomar geschrieben, damit nie ein halber Cache-Eintrag gelesen wird.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    write_text_atomic(cached_transcript_path(cache_dir, digest, language), text, durable)
+
+
+def store_transcript(file_path: Path, full_text: str, durable: bool = False) -> None:
+    """
+    Speichert die Transkription als .txt neben der Audio-Datei und gibt sie aus.
+
+    Atomar geschrieben: eine halbe .txt nach einem Abbruch würde sonst beim
+    nächsten Lauf als fertige Transkription gelten.
+    """
+    txt_path = file_path.with_suffix(".txt")
+    write_text_atomic(txt_path, full_text, durable)
+    logger.info("Transkription gespeichert: %s", txt_path)
+
+    # Transkription ausgeben
+    print()
+    print(full_text)
+    print()
+
+
+async def process_file(
+    client: "AsyncOpenAI",
+    file_path: Path,
+    language: str | None,
+    semaphore: asyncio.Semaphore,
+    *,
+    cache_dir: Path | None = None,
+    file_size: int | None = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    durable: bool = False,
+    convert_semaphore: asyncio.Semaphore | None = None,
+    skip_silence: bool = False,
+) -> None:
+    """
+    Bereitet eine Audio-Datei vor (ggf. konvertieren/splitten), transkribiert
+    sie und speichert den Text als .txt neben der Audio-Datei.
+
+    Die Semaphore begrenzt, wie viele Dateien gleichzeitig verarbeitet werden,
+    convert_semaphore die gleichzeitigen ffmpeg-Läufe. Mit cache_dir werden
+    bereits bekannte Inhalte nicht erneut an die API geschickt.
+    """
+    async with semaphore:
+        logger.info("--- Verarbeite: %s ---", file_path.name)
+
+        if file_size is None:
+            file_size = file_path.stat().st_size
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Dateigröße: %s", format_size(file_size))
+
+        if file_size == 0:
+            logger.warning("%s: Datei ist leer, überspringe...", file_path.name)
+            return
+
+        # Bereits transkribierten Inhalt aus dem Cache übernehmen
+        digest = None
+        if cache_dir is not None:
+            digest = await asyncio.to_thread(audio_digest, file_path)
+            cached_text = load_cached_transcript(cache_dir, digest, language)
+            if cached_text is not None:
+                logger.info("%s: Transkription aus Cache (%s)", file_path.name, digest)
+                store_transcript(file_path, cached_text, durable)
+                return
+
+        # Dauer nur einmal per ffprobe ermitteln, falls sie gebraucht wird
+        duration = None
+        if skip_silence or file_size > MAX_FILE_SIZE:
+            duration = await asyncio.to_thread(get_audio_duration, file_path)
+
+        # Reine Stille nicht an die API schicken (silencedetect ist CPU-gebunden
+        # wie eine Konvertierung, daher dieselbe Semaphore)
+        if skip_silence:
+            async with convert_semaphore or contextlib.nullcontext():
+                silent = await asyncio.to_thread(is_effectively_silent, file_path, duration)
+            if silent:
+                logger.info("%s: Enthält nur Stille, überspringe Transkription", file_path.name)
+                write_text_atomic(file_path.with_suffix(".txt"), "", durable)
+                return
+
+        # Datei für Transkription vorbereiten (ggf. konvertieren/splitten).
+        # Konvertierte Inhalte bleiben im Speicher, None heißt: Datei direkt senden.
+        segments = None
+
+        if file_size > MAX_FILE_SIZE:
+            logger.warning("Datei zu groß (%s) - konvertiere zu MP3...", format_size(file_size))
+
+            # ffmpeg ist CPU-gebunden: die Konvertierungs-Semaphore begrenzt,
+            # wie viele Dateien gleichzeitig konvertiert werden
+            async with convert_semaphore or contextlib.nullcontext():
+                segments = await asyncio.to_thread(prepare_mp3_segments, file_path, duration)
+
+            if not segments:
+                logger.error("%s: Keine Segmente erstellt", file_path.name)
+                return
+
+        # Transkribieren
+        try:
+            all_texts = []
+            if segments is None:
+                # Datei ist klein genug
+                text = await transcribe_file(
+                    client, file_path, language=language, max_retries=max_retries
+                )
+                all_texts.append(text)
+            else:
+                mp3_path = file_path.with_suffix(".mp3")
+                for idx, segment in enumerate(segments):
+                    if len(segments) > 1:
+                        logger.info(
+                            "%s: Transkribiere Segment %d/%d...", file_path.name, idx + 1, len(segments)
+                        )
+                    text = await transcribe_file(
+                        client, mp3_path, language=language, content=segment, max_retries=max_retries
+                    )
+                    all_texts.append(text)
+
+            # Alle Texte zusammenfügen (mit Überlappungs-Erkennung bei mehreren Segmenten)
+            if len(all_texts) > 1:
+                logger.info("Führe Segmente zusammen (entferne Überlappungen)...")
+                full_text = find_overlap_and_merge(all_texts)
+            else:
+                full_text = all_texts[0] if all_texts else ""
+
+            # Transkription als .txt neben der Audio-Datei speichern
+            store_transcript(file_path, full_text, durable)
+            if digest is not None:
+                save_cached_transcript(cache_dir, digest, full_text, durable, language)
+
+        except Exception as e:
+            logger.error("%s: Fehler bei Transkription: %s", file_path.name, e)
+
+
+class RecordingWatcher:
+    """
+    Wartet, bis Audio-Dateien fertig geschrieben sind, und reicht sie dann
+    an handle(path) weiter.
+
+    Eine Datei gilt als fertig, wenn sie settle_time Sekunden lang nicht mehr
+    verändert wurde - laufende Aufnahmen werden ständig weitergeschrieben.
+    Jede Änderung (touch) startet die Wartezeit neu, gelöschte Dateien
+    (forget) werden verworfen.
+    """
+
+    def __init__(self, handle, settle_time: float = WATCH_SETTLE_TIME):
+        self.handle = handle
+        self.settle_time = settle_time
+        self.timers: dict[Path, asyncio.TimerHandle] = {}
+        self.tasks: dict[Path, asyncio.Task] = {}
+
+    def touch(self, path: Path) -> None:
+        """Merkt eine neue oder geänderte Datei vor (Wartezeit beginnt neu)."""
+        self.forget(path)
+        loop = asyncio.get_running_loop()
+        self.timers[path] = loop.call_later(self.settle_time, self._settled, path)
+
+    def forget(self, path: Path) -> None:
+        """Verwirft eine vorgemerkte Datei (z.B. weil sie gelöscht wurde)."""
+        timer = self.timers.pop(path, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _settled(self, path: Path) -> None:
+        del self.timers[path]
+        if path in self.tasks or not path.is_file() or path.with_suffix(".txt").exists():
+            return
+        task = asyncio.get_running_loop().create_task(self.handle(path))
+        self.tasks[path] = task
+        task.add_done_callback(lambda t: self._done(path, t))
+
+    def _done(self, path: Path, task: asyncio.Task) -> None:
+        del self.tasks[path]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("%s: Fehler bei Verarbeitung: %s", path.name, task.exception())
+
+
+async def watch_recordings(directory: Path, watcher: RecordingWatcher) -> None:
+    """
+    Beobachtet das Verzeichnis (inotify/FSEvents über watchfiles) und meldet
+    Änderungen an Audio-Dateien an den RecordingWatcher. Läuft bis zum
+    Abbruch (Ctrl+C).
+    """
+    from watchfiles import Change, awatch
+
+    logger.info("Beobachte %s auf neue Aufnahmen (Ctrl+C zum Beenden)...", directory)
+    async for changes in awatch(directory, recursive=False):
+        for change, raw_path in changes:
+            path = Path(raw_path)
+            if path.suffix.lower() not in SUPPORTED_FORMATS:
+                continue
+            if change == Change.deleted:
+                watcher.forget(path)
+            else:
+                watcher.touch(path)
+
+
+async def process_files(
+    api_key: str,
+    files: list[tuple[Path, os.stat_result]],
+    language: str | None,
+    concurrency: int,
+    *,
+    cache_dir: Path | None = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    durable: bool = False,
+    convert_jobs: int = DEFAULT_CONVERT_JOBS,
+    watch_dir: Path | None = None,
+    skip_silence: bool = False,
+) -> None:
+    """
+    Verarbeitet alle Dateien, höchstens `concurrency` gleichzeitig und mit
+    höchstens `convert_jobs` parallelen ffmpeg-Konvertierungen.
+
+    files enthält (Pfad, stat-Ergebnis)-Paare aus scan_untranscribed_recordings.
+    Alle Dateien teilen sich einen Client und damit einen Verbindungs-Pool,
+    der auf `concurrency` gleichzeitige Uploads ausgelegt ist. Mit watch_dir
+    wird das Verzeichnis beobachtet; neue und die übergebenen Dateien werden
+    verarbeitet, sobald sie fertig geschrieben sind.
+    """
+    import httpx
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+    )
+    # Wiederholungen übernimmt transcribe_file, nicht das SDK (sonst doppelt)
+    async with AsyncOpenAI(api_key=api_key, max_retries=0, http_client=http_client) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        convert_semaphore = asyncio.Semaphore(convert_jobs)
+
+        def handle(path: Path, file_size: int | None = None):
+            return process_file(
+                client,
+                path,
+                language,
+                semaphore,
+                cache_dir=cache_dir,
+                file_size=file_size,
+                max_retries=max_retries,
+                durable=durable,
+                convert_semaphore=convert_semaphore,
+                skip_silence=skip_silence,
+            )
+
+        if watch_dir is not None:
+            # Beobachtung läuft ab sofort, auch während der ersten Dateien. Diese
+            # durchlaufen dieselbe Wartezeit: eine noch laufende Aufnahme würde
+            # sonst abgeschnitten transkribiert.
+            watcher = RecordingWatcher(handle)
+            watch_task = asyncio.create_task(watch_recordings(watch_dir, watcher))
+            for path, _ in files:
+                watcher.touch(path)
+            await watch_task
+            return
+
+        results = await asyncio.gather(
+            *(handle(path, st.st_size) for path, st in files),
+            return_exceptions=True,
+        )
+        # Fehler außerhalb der Transkription (z.B. Datei inzwischen gelöscht)
+        for (path, _), result in zip(files, results):
+            if isinstance(result, Exception):
+                logger.error("%s: Fehler bei Verarbeitung: %s", path.name, result)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Transkribiert alle Audio-Dateien ohne .txt-Entsprechung im Recordings-Verzeichnis"
@@ -356,8 +987,73 @@ def main():
         default=str(DEFAULT_RECORDINGS_DIR),
         help=f"Verzeichnis für Suche nach neuester Datei (Standard: {DEFAULT_RECORDINGS_DIR})",
     )
+    parser.add_argument(
+        "--limit",
+        "-n",
+        type=int,
+        help="Höchstens so viele Dateien verarbeiten (die ältesten zuerst)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Anzahl gleichzeitig verarbeiteter Dateien (Standard: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--convert-jobs",
+        "-j",
+        type=int,
+        default=DEFAULT_CONVERT_JOBS,
+        help=f"Anzahl gleichzeitiger ffmpeg-Konvertierungen (Standard: {DEFAULT_CONVERT_JOBS})",
+    )
+    parser.add_argument(
+        "--watch",
+        "-w",
+        action="store_true",
+        help="Nach der Verarbeitung weiterlaufen und neue Aufnahmen sofort transkribieren",
+    )
+    parser.add_argument(
+        "--skip-silence",
+        action="store_true",
+        help="Aufnahmen, die nur Stille enthalten, nicht senden (leere .txt)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Transkriptions-Cache nicht verwenden ({CACHE_DIR})",
+    )
+
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="Nur Warnungen und Fehler ausgeben (Transkriptionen weiterhin)",
+    )
+    parser.add_argument(
+        "--durable",
+        action="store_true",
+        help="Transkriptionen per fsync sofort auf die Platte schreiben",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"Wiederholungen bei Rate-Limit/Serverfehlern (Standard: {DEFAULT_MAX_RETRIES})",
+    )
 
     args = parser.parse_args()
+    if args.limit is not None and args.limit < 1:
+        parser.error("--limit muss mindestens 1 sein")
+    if args.concurrency < 1:
+        parser.error("--concurrency muss mindestens 1 sein")
+    if args.convert_jobs < 1:
+        parser.error("--convert-jobs muss mindestens 1 sein")
+    if args.max_retries < 0:
+        parser.error("--max-retries darf nicht negativ sein")
+
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
 
     logger.info("App gestartet")
 
@@ -371,115 +1067,57 @@ def main():
     # Recordings-Verzeichnis prüfen
     search_dir = Path(args.dir).expanduser()
     if not search_dir.exists():
-        logger.error(f"Verzeichnis nicht gefunden: {search_dir}")
+        logger.error("Verzeichnis nicht gefunden: %s", search_dir)
         sys.exit(1)
 
     # Untranscribierte WAV-Dateien finden
-    files_to_process = find_untranscribed_recordings(search_dir)
+    files_to_process = scan_untranscribed_recordings(search_dir, args.limit)
 
     if not files_to_process:
-        logger.info(f"Keine unverarbeiteten Audio-Dateien in: {search_dir}")
-        sys.exit(0)
-
-    logger.info(f"{len(files_to_process)} Datei(en) zu verarbeiten:")
-    for f in files_to_process:
-        logger.info(f"  - {f.name}")
+        logger.info("Keine unverarbeiteten Audio-Dateien in: %s", search_dir)
+        if not args.watch:
+            sys.exit(0)
+    else:
+        logger.info("%d Datei(en) zu verarbeiten:", len(files_to_process))
+        for f, _ in files_to_process:
+            logger.info("  - %s", f.name)
 
     # Sprache (None = automatische Erkennung)
     language = args.language
     if language:
-        logger.info(f"Sprache: {language}")
+        logger.info("Sprache: %s", language)
     else:
         logger.info("Sprache: Automatische Erkennung")
 
-    # OpenAI-Client erstellen
-    client = OpenAI(api_key=api_key)
-
-    # Alle Dateien verarbeiten
-    for file_path in files_to_process:
-        logger.info(f"--- Verarbeite: {file_path.name} ---")
-
-        file_size = file_path.stat().st_size
-        logger.info(f"Dateigröße: {format_size(file_size)}")
-
-        if file_size == 0:
-            logger.warning("Datei ist leer, überspringe...")
-            continue
-
-        # Datei für Transkription vorbereiten (ggf. konvertieren/splitten)
-        temp_dir = None
-        segments_to_transcribe = []
-
-        if file_size > MAX_FILE_SIZE:
-            logger.warning(f"Datei zu groß ({format_size(file_size)}) - teile in Segmente...")
-
-            # Temporäres Verzeichnis für Segmente
-            temp_dir = Path(tempfile.mkdtemp(prefix="transcribe_"))
-
-            # Erst versuchen, als einzelne MP3 zu konvertieren
-            temp_mp3 = temp_dir / "converted.mp3"
-            if convert_to_mp3(file_path, temp_mp3):
-                temp_size = temp_mp3.stat().st_size
-                logger.info(f"Konvertiert: {format_size(temp_size)}")
-
-                if temp_size <= MAX_FILE_SIZE:
-                    # Passt als einzelne Datei
-                    segments_to_transcribe = [temp_mp3]
-                else:
-                    # Immer noch zu groß - in Segmente teilen
-                    logger.info("Immer noch zu groß - teile in Segmente...")
-                    temp_mp3.unlink()
-                    segments_to_transcribe = split_audio_to_segments(file_path, temp_dir)
-            else:
-                # Konvertierung fehlgeschlagen
-                if temp_dir:
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-                continue
-
-            if not segments_to_transcribe:
-                logger.error("Keine Segmente erstellt")
-                if temp_dir:
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-                continue
-        else:
-            # Datei ist klein genug
-            segments_to_transcribe = [file_path]
-
-        # Transkribieren
-        try:
-            all_texts = []
-            for idx, segment_path in enumerate(segments_to_transcribe):
-                if len(segments_to_transcribe) > 1:
-                    logger.info(f"Transkribiere Segment {idx+1}/{len(segments_to_transcribe)}...")
-                text = transcribe_file(client, segment_path, language=language)
-                all_texts.append(text)
-
-            # Alle Texte zusammenfügen (mit Überlappungs-Erkennung bei mehreren Segmenten)
-            if len(all_texts) > 1:
-                logger.info("Führe Segmente zusammen (entferne Überlappungen)...")
-                full_text = find_overlap_and_merge(all_texts)
-            else:
-                full_text = all_texts[0] if all_texts else ""
-
-            # Transkription als .txt neben der Audio-Datei speichern
-            txt_path = file_path.with_suffix(".txt")
-            txt_path.write_text(full_text, encoding="utf-8")
-            logger.info(f"Transkription gespeichert: {txt_path}")
-
-            # Transkription ausgeben
-            print()
-            print(full_text)
-            print()
-
-        except Exception as e:
-            logger.error(f"Fehler bei Transkription: {e}")
-        finally:
-            # Temporäres Verzeichnis aufräumen
-            if temp_dir:
-                shutil.rmtree(temp_dir, ignore_errors=True)
+    # Alle Dateien verarbeiten (mehrere gleichzeitig)
+    logger.info("Parallele Verarbeitung: bis zu %d Datei(en)", args.concurrency)
+    cache_dir = None if args.no_cache else CACHE_DIR
+    try:
+        asyncio.run(
+            process_files(
+                api_key,
+                files_to_process,
+                language,
+                args.concurrency,
+                cache_dir=cache_dir,
+                max_retries=args.max_retries,
+                durable=args.durable,
+                convert_jobs=args.convert_jobs,
+                watch_dir=search_dir if args.watch else None,
+                skip_silence=args.skip_silence,
+            )
+        )
+    except KeyboardInterrupt:
+        logger.info("Abgebrochen")
 
     logger.info("App beendet")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
     main()